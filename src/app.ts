@@ -29,7 +29,8 @@ import {
   generalLimiter, 
   authLimiter, 
   aiGenerationLimiter, 
-  uploadLimiter 
+  uploadLimiter,
+  MONITORING_PATHS
 } from './middleware/rate-limit.middleware'
 
 import authRoutes from './routes/auth.routes'
@@ -44,6 +45,12 @@ import webhookRoutes from './routes/webhook.routes'
 import translationRoutes from './routes/translation.routes'
 import trackingRoutes from './routes/tracking.routes'
 
+// IDs de requisição = prefixo único do processo (gerado uma vez no boot) +
+// contador sequencial - sem ler o relógio nem sortear/formatar um aleatório a cada requisição,
+// e sem risco de colisão entre requisições do mesmo milissegundo
+const REQUEST_ID_PREFIX = `req_${Date.now().toString(36)}${Math.random().toString(36).slice(2, 6)}_`
+let requestSequence = 0
+
 class App {
   public app: express.Application
   public port: number
@@ -141,7 +148,7 @@ class App {
     
     this.app.use((req, _res, next) => {
       req.headers['x-request-id'] = req.headers['x-request-id'] || 
-        `req_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
+        REQUEST_ID_PREFIX + (++requestSequence).toString(36)
       next()
     })
   }
@@ -235,10 +242,7 @@ class App {
     // ✅ ROTAS AI COM RATE LIMITING CONDICIONAL
     this.app.use(`${API_PREFIX}/ai`, (req, res, next) => {
       // Excluir endpoints de health e status do rate limiting
-      const excludedPaths = ['/health', '/test-connection', '/metrics', '/status']
-      const isExcluded = excludedPaths.some(path => req.path === path)
-      
-      if (isExcluded) {
+      if (MONITORING_PATHS.has(req.path)) {
         // Pular rate limiting para endpoints de monitoramento
         next()
       } else {
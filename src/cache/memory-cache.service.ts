@@ -3,7 +3,6 @@ import { logger } from '../utils/logger'
 interface CacheItem<T> {
   data: T
   expiresAt: number
-  createdAt: number
 }
 
 class MemoryCacheService {
@@ -44,11 +43,7 @@ class MemoryCacheService {
   // ========== CACHE GERAL ==========
   set<T>(key: string, data: T, ttl?: number): void {
     const expiresAt = Date.now() + (ttl || this.defaultTTL)
-    this.cache.set(key, {
-      data,
-      expiresAt,
-      createdAt: Date.now()
-    })
+    this.cache.set(key, { data, expiresAt })
 
     // 📊 METRICS: Track cache operations
     this.metrics.sets++
@@ -69,7 +64,8 @@ class MemoryCacheService {
       return null
     }
 
-    if (Date.now() > item.expiresAt) {
+    const now = Date.now()
+    if (now > item.expiresAt) {
       this.cache.delete(key)
       this.metrics.evictions++
       logger.debug('⏰ [CACHE-PERF] Expired item removed:', { key: key.substring(0, 30) + '...' })
@@ -81,7 +77,7 @@ class MemoryCacheService {
     
     logger.debug('✅ [CACHE-PERF] Cache hit:', { 
       key: key.substring(0, 30) + '...', 
-      age: Date.now() - item.createdAt 
+      expiresIn: item.expiresAt - now
     })
     return item.data
   }
@@ -91,11 +87,7 @@ class MemoryCacheService {
     const key = `auth:${this.hashToken(token)}`
     const expiresAt = Date.now() + this.authTTL
     
-    this.authCache.set(key, {
-      data: userData,
-      expiresAt,
-      createdAt: Date.now()
-    })
+    this.authCache.set(key, { data: userData, expiresAt })
 
     logger.debug('🔐 [AUTH_CACHE] User cached:', { 
       userId: userData.id,
@@ -112,7 +104,8 @@ class MemoryCacheService {
       return null
     }
 
-    if (Date.now() > item.expiresAt) {
+    const now = Date.now()
+    if (now > item.expiresAt) {
       this.authCache.delete(key)
       logger.debug('⏰ [AUTH_CACHE] Expired auth removed:', { userId: item.data?.id })
       return null
@@ -120,7 +113,7 @@ class MemoryCacheService {
 
     logger.debug('✅ [AUTH_CACHE] Auth cache hit:', { 
       userId: item.data?.id,
-      age: Date.now() - item.createdAt 
+      age: now - (item.expiresAt - this.authTTL)
     })
     return item.data
   }
@@ -136,11 +129,7 @@ class MemoryCacheService {
     const key = `subscription:${userId}`
     const expiresAt = Date.now() + this.subscriptionTTL
     
-    this.subscriptionCache.set(key, {
-      data: subscriptionData,
-      expiresAt,
-      createdAt: Date.now()
-    })
+    this.subscriptionCache.set(key, { data: subscriptionData, expiresAt })
 
     logger.debug('💳 [SUB_CACHE] Subscription cached:', { 
       userId,
@@ -158,7 +147,8 @@ class MemoryCacheService {
       return null
     }
 
-    if (Date.now() > item.expiresAt) {
+    const now = Date.now()
+    if (now > item.expiresAt) {
       this.subscriptionCache.delete(key)
       logger.debug('⏰ [SUB_CACHE] Expired subscription removed:', { userId })
       return null
@@ -167,7 +157,7 @@ class MemoryCacheService {
     logger.debug('✅ [SUB_CACHE] Subscription cache hit:', { 
       userId,
       planType: item.data?.plan_type,
-      age: Date.now() - item.createdAt 
+      age: now - (item.expiresAt - this.subscriptionTTL)
     })
     return item.data
   }
@@ -247,6 +237,7 @@ class MemoryCacheService {
   // 📊 ENHANCED: Estatísticas detalhadas do cache com performance metrics
   getStats(): any {
     const totalOperations = this.metrics.hits + this.metrics.misses
+    const memoryUsage = process.memoryUsage()
     const hitRate = totalOperations > 0 ? (this.metrics.hits / totalOperations * 100).toFixed(2) : '0.00'
     
     return {
@@ -271,8 +262,8 @@ class MemoryCacheService {
         totalOperations
       },
       memory: {
-        used: process.memoryUsage().heapUsed / 1024 / 1024,
-        total: process.memoryUsage().heapTotal / 1024 / 1024
+        used: memoryUsage.heapUsed / 1024 / 1024,
+        total: memoryUsage.heapTotal / 1024 / 1024
       }
     }
   }
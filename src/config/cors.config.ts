@@ -16,6 +16,8 @@ const allowedOrigins = [
   'http://127.0.0.1:3000'
 ].filter(Boolean) // Remove valores undefined/null
 
+const allowedOriginsIndex = new Set(allowedOrigins)
+
 console.log('🌐 [CORS] URLs permitidas:', allowedOrigins)
 
 export const corsOptions: CorsOptions = {
@@ -29,7 +31,7 @@ export const corsOptions: CorsOptions = {
     }
     
     // ✅ Verificar se origin está na lista permitida
-    if (allowedOrigins.includes(origin)) {
+    if (allowedOriginsIndex.has(origin)) {
       console.log('✅ [CORS] Origin permitido:', origin)
       callback(null, true)
     } else {
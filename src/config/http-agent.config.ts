@@ -0,0 +1,15 @@
+import http from 'http'
+import https from 'https'
+
+// 🚀 OTIMIZAÇÃO: Agentes HTTP com keep-alive compartilhados pelos clientes axios do OpenRouter
+// (IA e tradução) - as conexões TCP/TLS ficam no pool entre requisições em vez de um novo
+// handshake a cada chamada. Sem maxSockets: o limite vale por host, os dois serviços chamam
+// openrouter.ai, e a espera por um socket livre não conta no timeout do axios
+const AGENT_OPTIONS = {
+  keepAlive: true,
+  keepAliveMsecs: 30 * 1000,
+  maxFreeSockets: 10
+}
+
+export const keepAliveHttpAgent = new http.Agent(AGENT_OPTIONS)
+export const keepAliveHttpsAgent = new https.Agent(AGENT_OPTIONS)
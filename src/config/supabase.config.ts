@@ -1,4 +1,5 @@
 import { createClient } from '@supabase/supabase-js'
+import { performance } from 'perf_hooks'
 import { Database } from '../database/types'
 import { logger } from '../utils/logger'
 
@@ -99,13 +100,13 @@ export function getSupabaseWithAuth(userToken?: string) {
 
 // 📊 ENHANCED CONNECTION TEST: Performance monitoring included
 export async function testConnection(): Promise<boolean> {
-  const startTime = Date.now()
+  const startTime = performance.now()
   
   try {
     // 🎯 OPTIMIZED QUERY: Minimal data fetch for connection test
     const { error } = await supabase.from('profiles').select('count').limit(1)
     
-    const responseTime = Date.now() - startTime
+    const responseTime = Math.round(performance.now() - startTime)
     
     if (error) {
       logger.error('[SUPABASE-PERF] Connection test failed:', {
@@ -123,7 +124,7 @@ export async function testConnection(): Promise<boolean> {
     
     return true
   } catch (error: any) {
-    const responseTime = Date.now() - startTime
+    const responseTime = Math.round(performance.now() - startTime)
     logger.error('[SUPABASE-PERF] Connection error:', {
       error: error?.message || 'Unknown error',
       responseTime: `${responseTime}ms`
@@ -1,5 +1,6 @@
 import { Request, Response } from 'express'
 import { validationResult } from 'express-validator'
+import { performance } from 'perf_hooks'
 import { HTTP_STATUS } from '../utils/constants'
 import { logger } from '../utils/logger'
 import { supabase } from '../config/supabase.config'
@@ -7,6 +8,111 @@ import { AuthRequest } from '../types/auth.types'
 import iaService from '../services/iaservice'
 import { generateFallbackHTML, processImages } from '../utils/email-helpers'
 
+const CHAT_FALLBACK_SUGGESTIONS: readonly string[] = Object.freeze([
+  'Tente ser mais específico na sua solicitação',
+  'Use o editor manual como alternativa',
+  'Verifique se a IA Service está configurada corretamente'
+])
+
+// Bits das verificações de validateEmail
+const VALIDATION_MISSING_DOCTYPE = 1
+const VALIDATION_MISSING_CHARSET = 2
+const VALIDATION_HAS_JAVASCRIPT = 4
+const VALIDATION_MISSING_FONT_SIZE = 8
+const VALIDATION_OVERSIZED = 16
+
+// Todos os marcadores da validação em uma única varredura do HTML, parando assim que
+// todos foram encontrados
+const VALIDATION_MARKERS_REGEX = /<!DOCTYPE|<meta charset|javascript:|<script|font-size/g
+const ALL_VALIDATION_MARKERS = 0b1111
+
+function scanValidationFlags(html: string): number {
+  let found = 0
+
+  VALIDATION_MARKERS_REGEX.lastIndex = 0
+  let match: RegExpExecArray | null
+  while (found !== ALL_VALIDATION_MARKERS && (match = VALIDATION_MARKERS_REGEX.exec(html)) !== null) {
+    const marker = match[0]
+    if (marker === '<!DOCTYPE') {
+      found |= VALIDATION_MISSING_DOCTYPE
+    } else if (marker === '<meta charset') {
+      found |= VALIDATION_MISSING_CHARSET
+    } else if (marker === 'font-size') {
+      found |= VALIDATION_MISSING_FONT_SIZE
+    } else {
+      found |= VALIDATION_HAS_JAVASCRIPT
+    }
+  }
+
+  // Bits de "ausência" ficam ligados quando o marcador não apareceu; JavaScript quando apareceu
+  return (found ^ ALL_VALIDATION_MARKERS ^ VALIDATION_HAS_JAVASCRIPT)
+}
+
+function buildValidationResult(flags: number) {
+  const issues: string[] = []
+  const suggestions = [
+    'HTML estruturado corretamente',
+    'Considere adicionar meta tags para melhor compatibilidade',
+    'Teste em diferentes clientes de email'
+  ]
+  let score = 85
+
+  if (flags & VALIDATION_MISSING_DOCTYPE) {
+    issues.push('HTML sem DOCTYPE declarado')
+    score -= 10
+  }
+
+  if (flags & VALIDATION_MISSING_CHARSET) {
+    issues.push('Charset não especificado')
+    score -= 5
+  }
+
+  if (flags & VALIDATION_HAS_JAVASCRIPT) {
+    issues.push('JavaScript detectado - pode ser bloqueado por clientes de email')
+    score -= 20
+  }
+
+  if (flags & VALIDATION_OVERSIZED) {
+    issues.push('HTML excede 102KB - o Gmail corta mensagens acima desse tamanho')
+    suggestions.push(
+      'Remova CSS e espaços em branco desnecessários',
+      'Hospede imagens externamente em vez de embuti-las no HTML'
+    )
+    score -= 15
+  }
+
+  if (flags & VALIDATION_MISSING_FONT_SIZE) {
+    suggestions.push('Considere especificar tamanhos de fonte para melhor consistência')
+  }
+
+  if (score > 80) {
+    suggestions.push('HTML bem estruturado para emails!')
+  }
+
+  return Object.freeze({
+    valid: issues.length === 0,
+    issues: Object.freeze(issues),
+    suggestions: Object.freeze(suggestions),
+    score
+  })
+}
+
+// As 32 combinações possíveis de resultado montadas uma única vez
+const VALIDATION_RESULTS = Object.freeze(
+  Array.from({ length: 32 }, (_, flags) => buildValidationResult(flags))
+)
+
+// Gmail corta (clipping) mensagens cujo HTML passa de ~102KB (em bytes UTF-8, não caracteres)
+const EMAIL_HTML_SIZE_LIMIT = 102 * 1024
+
+// Cada unidade UTF-16 vira de 1 a 3 bytes em UTF-8: html.length sozinho já decide os dois
+// extremos, e a contagem de bytes só roda na faixa em que ele não basta
+function exceedsEmailSizeLimit(html: string): boolean {
+  if (html.length > EMAIL_HTML_SIZE_LIMIT) {
+    return true
+  }
+  return html.length * 3 > EMAIL_HTML_SIZE_LIMIT && Buffer.byteLength(html, 'utf8') > EMAIL_HTML_SIZE_LIMIT
+}
 
 
 const generateEmail = async (req: AuthRequest, res: Response): Promise<void> => {
@@ -90,9 +196,9 @@ const generateEmail = async (req: AuthRequest, res: Response): Promise<void> =>
         userId
       }
 
-      const startTime = Date.now()
+      const startTime = performance.now()
       const iaResponse = await iaService.generateHTML(iaRequest)
-      const processingTime = Date.now() - startTime
+      const processingTime = Math.round(performance.now() - startTime)
 
       const estimatedTokens = Math.ceil(iaResponse.html.length / 4)
       const estimatedCost = estimatedTokens * 0.000003
@@ -206,14 +312,14 @@ const modifyEmail = async (req: AuthRequest, res: Response): Promise<void> => {
     }
 
     try {
-      const startTime = Date.now()
+      const startTime = performance.now()
       const iaResponse = await iaService.modifyHTML(
         instructions, 
         html, 
         finalImageUrls,
         imageIntents
       )
-      const processingTime = Date.now() - startTime
+      const processingTime = Math.round(performance.now() - startTime)
 
       const estimatedTokens = Math.ceil(iaResponse.html.length / 4)
       const estimatedCost = estimatedTokens * 0.000003
@@ -272,7 +378,9 @@ const modifyEmail = async (req: AuthRequest, res: Response): Promise<void> => {
   }
 }
 
-const validateEmail = async (req: AuthRequest, res: Response): Promise<void> => {
+// Validação é 100% síncrona (varredura de bits + resultado pré-montado) -
+// sem async, a resposta sai no mesmo tick, sem criar e resolver uma Promise por requisição
+const validateEmail = (req: AuthRequest, res: Response): void => {
   try {
     const { html } = req.body
 
@@ -284,48 +392,10 @@ const validateEmail = async (req: AuthRequest, res: Response): Promise<void> =>
       return
     }
 
-    const validation: {
-      valid: boolean
-      issues: string[]
-      suggestions: string[]
-      score: number
-    } = {
-      valid: true,
-      issues: [],
-      suggestions: [
-        'HTML estruturado corretamente',
-        'Considere adicionar meta tags para melhor compatibilidade',
-        'Teste em diferentes clientes de email'
-      ],
-      score: 85
-    }
-
-    if (!html.includes('<!DOCTYPE')) {
-      validation.issues.push('HTML sem DOCTYPE declarado')
-      validation.score -= 10
-    }
+    // Tamanho checado antes da varredura - na maioria dos emails basta comparar html.length
+    const flags = (exceedsEmailSizeLimit(html) ? VALIDATION_OVERSIZED : 0) | scanValidationFlags(html)
 
-    if (!html.includes('<meta charset')) {
-      validation.issues.push('Charset não especificado')
-      validation.score -= 5
-    }
-
-    if (html.includes('javascript:') || html.includes('<script')) {
-      validation.issues.push('JavaScript detectado - pode ser bloqueado por clientes de email')
-      validation.score -= 20
-    }
-
-    if (!html.includes('font-size')) {
-      validation.suggestions.push('Considere especificar tamanhos de fonte para melhor consistência')
-    }
-
-    if (validation.issues.length > 0) {
-      validation.valid = false
-    }
-
-    if (validation.score > 80) {
-      validation.suggestions.push('HTML bem estruturado para emails!')
-    }
+    const validation = VALIDATION_RESULTS[flags]
 
     // Validação não consome créditos
     res.status(HTTP_STATUS.OK).json({
@@ -407,7 +477,10 @@ const processChat = async (req: AuthRequest, res: Response): Promise<void> => {
       }
       
       // ✅ DETERMINAR OPERAÇÃO ROBUSTA
-      const hasExistingHTML = !!(existingHTML && existingHTML.trim().length > 0)
+      // As duas origens já garantem HTML não vazio - o do frontend passou pelo
+      // trim() acima e o HTMLResolver só devolve HTML aparado e não vazio (ou null) - então não
+      // há por que aparar o documento inteiro de novo só para repetir a mesma checagem
+      const hasExistingHTML = htmlSource !== 'none'
       let finalOperation = operation || HTMLResolver.determineOperation(message, hasExistingHTML)
       
       // 🚀 VALIDAÇÃO CRÍTICA: Alertar se há discrepância
@@ -458,8 +531,14 @@ const processChat = async (req: AuthRequest, res: Response): Promise<void> => {
 
       // ✅ CRÉDITOS SÃO CONSUMIDOS AUTOMATICAMENTE PELO MIDDLEWARE consumeAICredit
       
+      // Histórico do chat, HTML do projeto e log de uso são gravações
+      // independentes - disparadas juntas em vez de esperar uma terminar para iniciar a outra
+      // (as duas mensagens do chat continuam em sequência para preservar a ordem)
+
       // ✅ SALVAR MENSAGENS NO BANCO
-      if (chat_id) {
+      const saveChatMessages = async (): Promise<void> => {
+        if (!chat_id) return
+        
         try {
           // 🔧 CORREÇÃO: Usar supabaseAdmin com type assertion para contornar limitações TypeScript
           const supabaseAdmin = require('../config/supabase.config').supabaseAdmin
@@ -503,7 +582,9 @@ const processChat = async (req: AuthRequest, res: Response): Promise<void> => {
       }
 
       // ✅ SALVAR HTML USANDO HTML-RESOLVER
-      if (project_id && iaResponse.html) {
+      const saveProjectHTML = async (): Promise<void> => {
+        if (!project_id || !iaResponse.html) return
+        
         try {
           await HTMLResolver.saveProjectHTML(project_id, iaResponse.html, iaResponse.subject)
         } catch (updateError) {
@@ -511,13 +592,17 @@ const processChat = async (req: AuthRequest, res: Response): Promise<void> => {
         }
       }
 
-      // Log de uso da API
-      await supabase.rpc('log_api_usage', {
-        p_user_id: userId,
-        p_endpoint: 'ai_chat',
-        p_tokens_used: estimatedTokens,
-        p_cost: estimatedCost
-      })
+      await Promise.all([
+        saveChatMessages(),
+        saveProjectHTML(),
+        // Log de uso da API
+        supabase.rpc('log_api_usage', {
+          p_user_id: userId,
+          p_endpoint: 'ai_chat',
+          p_tokens_used: estimatedTokens,
+          p_cost: estimatedCost
+        })
+      ])
 
       res.status(HTTP_STATUS.OK).json({
         success: true,
@@ -555,11 +640,7 @@ const processChat = async (req: AuthRequest, res: Response): Promise<void> => {
         message: 'Chat processado com limitações',
         data: {
           response: 'Desculpe, não consegui processar sua solicitação no momento. Tente reformular sua pergunta ou use o editor manual.',
-          suggestions: [
-            'Tente ser mais específico na sua solicitação',
-            'Use o editor manual como alternativa',
-            'Verifique se a IA Service está configurada corretamente'
-          ]
+          suggestions: CHAT_FALLBACK_SUGGESTIONS
         },
         metadata: {
           service: 'mailtrendz-chat-fallback',
@@ -581,14 +662,15 @@ const processChat = async (req: AuthRequest, res: Response): Promise<void> => {
 
 export const getHealthStatus = async (_req: Request, res: Response): Promise<void> => {
   try {
+    const memoryUsage = process.memoryUsage()
     const nodeHealth = {
       status: 'healthy',
       service: 'mailtrendz-nodejs-backend-ia',
       database: 'supabase',
       uptime: Math.round(process.uptime()),
       memory: {
-        used: Math.round(process.memoryUsage().heapUsed / 1024 / 1024),
-        total: Math.round(process.memoryUsage().heapTotal / 1024 / 1024)
+        used: Math.round(memoryUsage.heapUsed / 1024 / 1024),
+        total: Math.round(memoryUsage.heapTotal / 1024 / 1024)
       }
     }
 
@@ -670,11 +752,12 @@ export const testConnection = async (_req: Request, res: Response): Promise<void
       return
     }
 
-    const startTime = Date.now()
+    const startTime = performance.now()
     const tests = []
     
     try {
-      const healthTest = await iaService.healthCheck()
+      // Teste de conexão explícito: sempre consulta a API, sem resultado em cache
+      const healthTest = await iaService.healthCheck(0)
       tests.push({
         endpoint: 'health_check',
         success: healthTest,
@@ -708,7 +791,7 @@ export const testConnection = async (_req: Request, res: Response): Promise<void
       })
     }
     
-    const responseTime = Date.now() - startTime
+    const responseTime = Math.round(performance.now() - startTime)
     const isConnected = tests.filter(t => t.success).length > 0
 
     res.status(HTTP_STATUS.OK).json({
@@ -8,6 +8,9 @@ import secureDbService from '../services/secure-db.service'
 import authTokenService from '../services/auth-token.service'
 // ✅ REMOVIDO: optimizedAuthService não mais necessário
 
+// UUID do Supabase (v1-v5), compilado uma única vez no carregamento do módulo
+const UUID_REGEX = /^[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$/i
+
 class AuthController {
   register = asyncHandler(async (req: any, res: Response) => {
     const userData: RegisterDto = req.body
@@ -53,8 +56,7 @@ class AuthController {
     const { supabaseUserId, email, name, avatar, provider } = req.body
     
     // ✅ VALIDAR UUID DO SUPABASE
-    const uuidRegex = /^[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$/i
-    if (!supabaseUserId || !uuidRegex.test(supabaseUserId)) {
+    if (!supabaseUserId || !UUID_REGEX.test(supabaseUserId)) {
       logger.error('❌ [SOCIAL LOGIN] Invalid UUID:', {
         supabaseUserId,
         typeof: typeof supabaseUserId,
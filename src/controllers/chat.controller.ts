@@ -1,11 +1,12 @@
 import { Response } from 'express'
+import { performance } from 'perf_hooks'
 import { AuthRequest } from '../types/auth.types'
 import ChatService from '../services/chat.service'
 import ProjectService from '../services/project.service'
 import { CreateChatDto, CreateMessageDto } from '../types/chat.types'
 import { HTTP_STATUS } from '../utils/constants'
 import { asyncHandler } from '../middleware/error.middleware'
-import iaService from '../services/iaservice'
+import iaService, { IARequest } from '../services/iaservice'
 import { logger } from '../utils/logger'
 import { processImages } from '../utils/email-helpers'
 
@@ -14,6 +15,155 @@ function getUserToken(req: AuthRequest): string | undefined {
   return authHeader?.startsWith('Bearer ') ? authHeader.slice(7) : undefined
 }
 
+const CHAT_AI_SUGGESTIONS: readonly string[] = Object.freeze([
+  'Você pode pedir modificações específicas',
+  'Use comandos como "mude a cor para azul" ou "adicione um botão"',
+  'Para salvar as alterações, peça para "aplicar as mudanças"'
+])
+
+const CHAT_HEALTH_RESPONSE = Object.freeze({
+  success: true,
+  data: Object.freeze({ status: 'ok', message: 'Health check temporariamente desabilitado' })
+})
+
+// Contexto de edição enviado pelo frontend resolvido uma única vez na entrada
+// da rota - o restante do fluxo lê campos já normalizados, sem repetir cadeias de ?. e || padrão
+interface ChatAIContext {
+  currentHtml: string | null
+  targetElement?: NonNullable<IARequest['editContext']>['targetElement']
+  priority: 'speed' | 'quality' | 'balanced'
+  preserveStructure: boolean
+}
+
+const EDIT_PRIORITIES: ReadonlySet<string> = new Set(['speed', 'quality', 'balanced'])
+
+const EMPTY_CHAT_AI_CONTEXT: Readonly<ChatAIContext> = Object.freeze({
+  currentHtml: null,
+  priority: 'balanced',
+  preserveStructure: true
+})
+
+function parseChatAIContext(context: any): Readonly<ChatAIContext> {
+  // Contexto ausente ou inválido (ex.: null) equivale a nenhum contexto
+  if (!context || typeof context !== 'object') {
+    return EMPTY_CHAT_AI_CONTEXT
+  }
+  
+  return {
+    currentHtml: typeof context.currentHtml === 'string' && context.currentHtml ? context.currentHtml : null,
+    targetElement: context.targetElement && typeof context.targetElement === 'object' ? context.targetElement : undefined,
+    priority: EDIT_PRIORITIES.has(context.priority) ? context.priority : 'balanced',
+    preserveStructure: context.preserveStructure !== false
+  }
+}
+
+// 🎯 Palavras-chave de edição em uma única alternação case-insensitive
+const EDIT_KEYWORDS_REGEX = new RegExp([
+  // Português - palavras específicas
+  'altere', 'modifique', 'mude', 'substitua', 'corrija', 'atualize',
+  'troque', 'edite', 'ajuste', 'refaça', 'conserte',
+  
+  // Inglês - palavras específicas
+  'change', 'modify', 'update', 'edit', 'fix', 'correct', 'adjust',
+  'replace', 'alter', 'revise',
+  
+  // Frases específicas
+  'muda para', 'troca por', 'substitui por', 'altera para',
+  'change to', 'replace with', 'update to'
+].join('|'), 'i')
+
+const HTML_DOCUMENT_MARKER_REGEX = /<(?:html|!DOCTYPE)/
+const HTML_CONTENT_MARKER_REGEX = /<(?:html|!DOCTYPE|body)/
+const HTML_MARKERS_REGEX = /<(html|!DOCTYPE|style|body)/g
+
+function scanHTMLMarkers(html: string): { valid: boolean, hasCSS: boolean, hasBody: boolean } {
+  let valid = false
+  let hasCSS = false
+  let hasBody = false
+
+  HTML_MARKERS_REGEX.lastIndex = 0
+  let match: RegExpExecArray | null
+  while (!(valid && hasCSS && hasBody) && (match = HTML_MARKERS_REGEX.exec(html)) !== null) {
+    const marker = match[1]
+    if (marker === 'style') {
+      hasCSS = true
+    } else if (marker === 'body') {
+      hasBody = true
+    } else {
+      valid = true
+    }
+  }
+
+  return { valid, hasCSS, hasBody }
+}
+
+interface OperationDetection {
+  operation: 'create' | 'edit' | 'analyze'
+  hasHTML: boolean
+  preserveStructure: boolean
+  confidence: number
+}
+
+// Resultados possíveis de detectOperation, montados uma única vez
+function operationDetection(
+  operation: OperationDetection['operation'],
+  hasHTML: boolean,
+  preserveStructure: boolean,
+  confidence: number
+): Readonly<OperationDetection> {
+  return Object.freeze({ operation, hasHTML, preserveStructure, confidence })
+}
+
+const FRONTEND_EDIT_DETECTION = operationDetection('edit', true, true, 95)
+const FRONTEND_EDIT_WITHOUT_HTML_DETECTION = operationDetection('create', false, false, 80)
+const FRONTEND_CREATE_DETECTION = operationDetection('create', false, false, 95)
+const FRONTEND_CREATE_WITH_HTML_DETECTION = operationDetection('create', true, false, 95)
+const TARGET_ELEMENT_DETECTION = operationDetection('edit', false, true, 90)
+const TARGET_ELEMENT_WITH_HTML_DETECTION = operationDetection('edit', true, true, 90)
+const NO_HTML_DETECTION = operationDetection('create', false, false, 85)
+const EDIT_KEYWORDS_DETECTION = operationDetection('edit', true, true, 80)
+const ANALYZE_DETECTION = operationDetection('analyze', true, true, 60)
+
+// Classificação da mensagem para o log de processamento
+const LATIN_LETTER_REGEX = /[a-zA-Z]/
+const SPECIAL_CHAR_REGEX = /[!@#$%^&*(),.?":{}|<>]/
+
+// 🚀 OTIMIZAÇÃO: Documento HTML localizado por abertura + fechamento (duas buscas lineares),
+// em vez de /<html[\s\S]*?<\/html>/i, que testa o fechamento caractere a caractere a partir
+// de cada abertura candidata
+const HTML_OPEN_REGEX = /<html/i
+const DOCTYPE_OPEN_REGEX = /<!DOCTYPE html/i
+const HTML_CLOSE_REGEX = /<\/html>/gi
+
+function extractHTMLDocument(text: string, openRegex: RegExp): string | null {
+  const open = openRegex.exec(text)
+  if (!open) {
+    return null
+  }
+  
+  // Primeiro </html> após a abertura (mesmo resultado do quantificador preguiçoso)
+  HTML_CLOSE_REGEX.lastIndex = open.index + open[0].length
+  const close = HTML_CLOSE_REGEX.exec(text)
+  return close ? text.slice(open.index, close.index + close[0].length) : null
+}
+
+// Percorre apenas os valores string do objeto, sem serializá-lo com JSON.stringify
+function findInStringValues(value: any, matcher: (text: string) => string | null, depth: number = 0): string | null {
+  if (typeof value === 'string') {
+    return matcher(value)
+  }
+  if (!value || typeof value !== 'object' || depth > 10) {
+    return null
+  }
+  for (const child of Object.values(value)) {
+    const found = findInStringValues(child, matcher, depth + 1)
+    if (found !== null) {
+      return found
+    }
+  }
+  return null
+}
+
 class ChatController {
   createChat = asyncHandler(async (req: AuthRequest, res: Response) => {
     const userId = req.user!.id
@@ -163,8 +313,9 @@ class ChatController {
       imageUrls = [],
       // ✨ NOVOS CAMPOS DA ARQUITETURA INTELIGENTE
       operation = 'analyze', // 'create' | 'edit' | 'analyze'
-      context = {}
+      context: rawContext
     } = req.body
+    const context = parseChatAIContext(rawContext)
 
     if (!message || typeof message !== 'string' || message.trim().length === 0) {
       res.status(HTTP_STATUS.BAD_REQUEST).json({
@@ -185,6 +336,13 @@ class ChatController {
     try {
       await ChatService.getChatById(chat_id, userId, userToken)
 
+      // O HTML atual vem das respostas anteriores da IA e não depende da mensagem
+      // que será gravada agora - a busca já é disparada e corre junto com a gravação
+      // (getLatestHTMLContent nunca rejeita: falhas viram null)
+      const latestHTMLPromise = iaService.isEnabled()
+        ? ChatService.getLatestHTMLContent(chat_id, userId)
+        : null
+
       const userMessage = await ChatService.addMessage(chat_id, userId, {
         chatId: chat_id,
         content: message,
@@ -216,7 +374,7 @@ class ChatController {
           const [chatHistory, existingHTML] = await Promise.all([
             ChatService.getChatMessages(chat_id, userId, 15, userToken),
             // 🚨 CORREÇÃO CRÍTICA: Usar novo método robusto
-            ChatService.getLatestHTMLContent(chat_id, userId)
+            latestHTMLPromise
           ])
 
           // 🎯 DETECÇÃO PRECISA DE OPERAÇÃO (método otimizado)
@@ -238,6 +396,9 @@ class ChatController {
             confidence: operationResult.confidence
           })
 
+          const currentHtml = context.currentHtml || existingHTML || ''
+          const requestTimestamp = new Date().toISOString()
+
           // 🔥 PREPARAR CONTEXTO COMPLETO PARA IA
           const iaRequest = {
             userInput: message,
@@ -246,131 +407,102 @@ class ChatController {
             // ✨ NOVA ARQUITETURA: Operação e contexto específicos
             operation: finalOperation,
             editContext: {
-              currentHtml: context.currentHtml || existingHTML || '',
-              targetElement: context.targetElement || null,
+              currentHtml,
+              targetElement: context.targetElement,
               preserveStructure: shouldPreserveStructure,
-              priority: context.priority || 'balanced'
+              priority: context.priority
             },
             context: {
               chat_id,
               project_id,
               isChat: true,
               userId,
-              timestamp: new Date().toISOString(),
+              timestamp: requestTimestamp,
               
               // ✨ CONTEXTO INTELIGENTE COM DETALHES PRECISOS
-              existingHTML: context.currentHtml || existingHTML || '',
+              existingHTML: currentHtml,
               isModification: finalOperation === 'edit',
               operation: finalOperation,
               preserveHtmlStructure: shouldPreserveStructure,
               htmlVersion: existingHTML ? 'existing' : 'new',
               
-              // ✨ EVOLUÇÃO DO HTML ATRAVÉS DAS CONVERSAS
-              htmlEvolution: {
-                current: existingHTML || '',
-                hasEvolved: chatHistory.length > 2,
-                previousVersions: chatHistory
-                  .filter((msg: any) => {
-                    if (msg.role !== 'ai' || !msg.content) return false
-                    // Buscar HTML no conteúdo da mensagem ou nos artifacts
-                    const hasHTML = msg.content.includes('<html') || 
-                                   msg.content.includes('<!DOCTYPE') ||
-                                   (msg.metadata && JSON.stringify(msg.metadata).includes('<html'))
-                    return hasHTML
-                  })
-                  .map((msg: any) => ({
-                    timestamp: msg.created_at,
-                    html: this.extractHTMLFromMessage(msg.content, msg.metadata),
-                    messageId: msg.id
-                  }))
-                  .slice(-3), // Últimas 3 versões para contexto
-                modificationCount: chatHistory.filter((msg: any) => 
-                  msg.role === 'user' && 
-                  this.containsEditKeywords(msg.content)
-                ).length
-              },
-              
               // 🚨 CONTEXTO SIMPLIFICADO DO CHAT (sem dependência de projects)
               chatContext: {
                 id: chat_id,
                 project_id: project_id || null,
                 messageCount: chatHistory.length,
                 hasExistingContent: hasExistingHTML,
-                lastActivity: new Date().toISOString()
-              },
-              
-              // 🚨 HISTÓRICO DO CHAT
-              chatHistory: chatHistory.slice(-8).map((msg: any) => ({
-                role: msg.role,
-                content: msg.content,
-                timestamp: msg.created_at,
-                id: msg.id
-              }))
+                lastActivity: requestTimestamp
+              }
             },
             userId
           }
 
           // ✨ LOG ULTRA-DETALHADO PARA DEBUG COMPLETO
-          logger.info('🚀 ENVIANDO CONTEXTO OTIMIZADO PARA IA', {
-            // Identificação
-            userId,
-            chatId: chat_id,
-            projectId: project_id,
-            timestamp: new Date().toISOString(),
-            
-            // Operação detectada
-            operation: {
-              detected: finalOperation,
-              confidence: operationResult.confidence,
-              frontend: operation,
-              shouldPreserveStructure,
-              reasons: {
-                hasHTML: hasExistingHTML,
+          // Em nível debug e montado só quando esse nível está ativo - o payload faz
+          // substrings, testes de regex na mensagem e varre as palavras-chave de edição
+          if (logger.isDebugEnabled()) {
+            logger.debug('🚀 ENVIANDO CONTEXTO OTIMIZADO PARA IA', {
+              // Identificação
+              userId,
+              chatId: chat_id,
+              projectId: project_id,
+              timestamp: requestTimestamp,
+              
+              // Operação detectada
+              operation: {
+                detected: finalOperation,
+                confidence: operationResult.confidence,
+                frontend: operation,
+                shouldPreserveStructure,
+                reasons: {
+                  hasHTML: hasExistingHTML,
+                  hasTargetElement: !!context.targetElement,
+                  containsEditKeywords: this.containsEditKeywords(message)
+                }
+              },
+              
+              // HTML Analysis
+              html: {
+                exists: hasExistingHTML,
+                length: existingHTML?.length || 0,
+                source: context.currentHtml ? 'frontend' : 'backend',
+                valid: existingHTML ? HTML_DOCUMENT_MARKER_REGEX.test(existingHTML) : false,
+                preview: existingHTML ? existingHTML.substring(0, 150) + '...' : null
+              },
+              
+              // Context Analysis
+              context: {
                 hasTargetElement: !!context.targetElement,
-                containsEditKeywords: this.containsEditKeywords(message)
+                elementType: context.targetElement?.elementType,
+                originalText: context.targetElement?.originalText?.substring(0, 50),
+                newText: context.targetElement?.newText?.substring(0, 50),
+                priority: context.priority,
+                preserveStructure: context.preserveStructure
+              },
+              
+              // Chat Analysis
+              chat: {
+                messageCount: chatHistory.length,
+                hasImages: finalImageUrls.length > 0,
+                imageCount: finalImageUrls.length,
+                lastActivity: chatHistory[chatHistory.length - 1]?.created_at
+              },
+              
+              // Message Analysis
+              message: {
+                length: message.length,
+                preview: message.substring(0, 100),
+                language: LATIN_LETTER_REGEX.test(message) ? 'latin' : 'other',
+                hasSpecialChars: SPECIAL_CHAR_REGEX.test(message)
               }
-            },
-            
-            // HTML Analysis
-            html: {
-              exists: hasExistingHTML,
-              length: existingHTML?.length || 0,
-              source: context.currentHtml ? 'frontend' : 'backend',
-              valid: existingHTML ? existingHTML.includes('<html') || existingHTML.includes('<!DOCTYPE') : false,
-              preview: existingHTML ? existingHTML.substring(0, 150) + '...' : null
-            },
-            
-            // Context Analysis
-            context: {
-              hasTargetElement: !!context.targetElement,
-              elementType: context.targetElement?.elementType,
-              originalText: context.targetElement?.originalText?.substring(0, 50),
-              newText: context.targetElement?.newText?.substring(0, 50),
-              priority: context.priority || 'balanced',
-              preserveStructure: context.preserveStructure !== false
-            },
-            
-            // Chat Analysis
-            chat: {
-              messageCount: chatHistory.length,
-              hasImages: finalImageUrls.length > 0,
-              imageCount: finalImageUrls.length,
-              lastActivity: chatHistory[chatHistory.length - 1]?.created_at
-            },
-            
-            // Message Analysis
-            message: {
-              length: message.length,
-              preview: message.substring(0, 100),
-              language: message.match(/[a-zA-Z]/) ? 'latin' : 'other',
-              hasSpecialChars: /[!@#$%^&*(),.?":{}|<>]/.test(message)
-            }
-          })
+            })
+          }
 
-          const startTime = Date.now()
+          const startTime = performance.now()
           // ✨ CHAMADA OTIMIZADA DA IA COM CONTEXTO ESPECÍFICO
           aiResponse = await iaService.generateHTML(iaRequest)
-          const processingTime = Date.now() - startTime
+          const processingTime = Math.round(performance.now() - startTime)
 
           // 🚨 SALVAR MENSAGEM COM HTML EM METADATA
           aiMessageResult = await ChatService.addMessage(chat_id, userId, {
@@ -397,61 +529,63 @@ class ChatController {
           }
 
           // 🔥 LOG COMPLETO DA RESPOSTA DA IA
-          logger.info('✅ RESPOSTA DA IA PROCESSADA COM SUCESSO', {
-            // Identificação
-            userId,
-            chatId: chat_id,
-            projectId: project_id,
-            timestamp: new Date().toISOString(),
-            
-            // Performance
-            timing: {
-              processingTime,
-              model: aiResponse.metadata?.model || 'unknown',
-              startTime: new Date(Date.now() - processingTime).toISOString()
-            },
-            
-            // HTML Analysis da Resposta
-            html: {
-              generated: !!aiResponse.html,
-              length: aiResponse.html?.length || 0,
-              valid: aiResponse.html ? (aiResponse.html.includes('<html') || aiResponse.html.includes('<!DOCTYPE')) : false,
-              preview: aiResponse.html ? aiResponse.html.substring(0, 200) + '...' : null,
-              hasCSS: aiResponse.html ? aiResponse.html.includes('<style') : false,
-              hasBody: aiResponse.html ? aiResponse.html.includes('<body') : false
-            },
-            
-            // Response Analysis
-            response: {
-              hasResponse: !!aiResponse.response,
-              length: aiResponse.response?.length || 0,
-              preview: aiResponse.response?.substring(0, 150) || 'No response text',
-              isEmpty: !aiResponse.response || aiResponse.response.trim().length === 0
-            },
-            
-            // Subject Analysis
-            subject: {
-              generated: !!aiResponse.subject,
-              value: aiResponse.subject || 'No subject generated',
-              length: aiResponse.subject?.length || 0
-            },
-            
-            // Metadata Analysis
-            metadata: {
-              isGenerated: aiResponse.metadata?.isGenerated,
-              service: aiResponse.metadata?.service,
-              imagesAnalyzed: aiResponse.metadata?.imagesAnalyzed || 0,
-              hasMetadata: !!aiResponse.metadata
-            },
-            
-            // Quality Check
-            quality: {
-              htmlAndResponseMatch: finalOperation === 'edit' ? 
-                (!!aiResponse.html && hasExistingHTML) : true,
-              expectedOperation: finalOperation,
-              deliveredContent: !!aiResponse.html ? 'html' : 'text_only'
-            }
-          })
+          // Em nível debug e montado só quando esse nível está ativo - o payload faz
+          // previews do HTML/resposta e varre o HTML gerado inteiro atrás dos marcadores
+          if (logger.isDebugEnabled()) {
+            logger.debug('✅ RESPOSTA DA IA PROCESSADA COM SUCESSO', {
+              // Identificação
+              userId,
+              chatId: chat_id,
+              projectId: project_id,
+              timestamp: new Date().toISOString(),
+              
+              // Performance
+              timing: {
+                processingTime,
+                model: aiResponse.metadata?.model || 'unknown',
+                startTime: new Date(Date.now() - processingTime).toISOString()
+              },
+              
+              // HTML Analysis da Resposta
+              html: {
+                generated: !!aiResponse.html,
+                length: aiResponse.html?.length || 0,
+                preview: aiResponse.html ? aiResponse.html.substring(0, 200) + '...' : null,
+                ...scanHTMLMarkers(aiResponse.html || '')
+              },
+              
+              // Response Analysis
+              response: {
+                hasResponse: !!aiResponse.response,
+                length: aiResponse.response?.length || 0,
+                preview: aiResponse.response?.substring(0, 150) || 'No response text',
+                isEmpty: !aiResponse.response || aiResponse.response.trim().length === 0
+              },
+              
+              // Subject Analysis
+              subject: {
+                generated: !!aiResponse.subject,
+                value: aiResponse.subject || 'No subject generated',
+                length: aiResponse.subject?.length || 0
+              },
+              
+              // Metadata Analysis
+              metadata: {
+                isGenerated: aiResponse.metadata?.isGenerated,
+                service: aiResponse.metadata?.service,
+                imagesAnalyzed: aiResponse.metadata?.imagesAnalyzed || 0,
+                hasMetadata: !!aiResponse.metadata
+              },
+              
+              // Quality Check
+              quality: {
+                htmlAndResponseMatch: finalOperation === 'edit' ? 
+                  (!!aiResponse.html && hasExistingHTML) : true,
+                expectedOperation: finalOperation,
+                deliveredContent: !!aiResponse.html ? 'html' : 'text_only'
+              }
+            })
+          }
 
           estimatedTokens = Math.ceil(message.length / 4)
           estimatedCost = estimatedTokens * 0.000003
@@ -481,11 +615,7 @@ class ChatController {
           },
           // ✨ ADICIONANDO HISTÓRICO COMPLETO PARA SINCRONIZAÇÃO
           chatHistory: updatedChatHistory,
-          suggestions: [
-            'Você pode pedir modificações específicas',
-            'Use comandos como "mude a cor para azul" ou "adicione um botão"',
-            'Para salvar as alterações, peça para "aplicar as mudanças"'
-          ]
+          suggestions: CHAT_AI_SUGGESTIONS
         },
         metadata: {
           ...aiResponse.metadata,
@@ -763,28 +893,9 @@ class ChatController {
     })
   })
 
-  getChatHealth = asyncHandler(async (req: AuthRequest, res: Response) => {
-    const userId = req.user!.id
-
-    try {
-      // ✅ TEMPORÁRIO: ChatHealthMonitor desabilitado durante migração
-      const healthCheck = { status: 'ok', message: 'Health check temporariamente desabilitado' }
-      
-      res.json({
-        success: true,
-        data: healthCheck
-      })
-    } catch (error: any) {
-      logger.error('Erro no health check de chat', {
-        error: error.message,
-        userId
-      })
-      
-      res.status(HTTP_STATUS.INTERNAL_SERVER_ERROR).json({
-        success: false,
-        message: 'Erro ao verificar saúde dos chats'
-      })
-    }
+  getChatHealth = asyncHandler(async (_req: AuthRequest, res: Response) => {
+    // ✅ TEMPORÁRIO: ChatHealthMonitor desabilitado durante migração
+    res.json(CHAT_HEALTH_RESPONSE)
   })
 
   // 🚨 IMPLEMENTAÇÃO OTIMIZADA: Usar função SQL para buscar HTML
@@ -888,7 +999,7 @@ class ChatController {
       // 🔧 CORRÇÃO: Caso 1 - artifacts é um objeto direto com content (aceita type text também)
       if (artifacts.content && (artifacts.type === 'html' || artifacts.type === 'text')) {
         const content = artifacts.content
-        if (content.includes('<html') || content.includes('<!DOCTYPE') || content.includes('<body')) {
+        if (HTML_CONTENT_MARKER_REGEX.test(content)) {
           return content
         }
       }
@@ -898,25 +1009,23 @@ class ChatController {
         for (const artifact of artifacts) {
           if (artifact.content && (artifact.type === 'html' || artifact.type === 'text')) {
             const content = artifact.content
-            if (content.includes('<html') || content.includes('<!DOCTYPE') || content.includes('<body')) {
+            if (HTML_CONTENT_MARKER_REGEX.test(content)) {
               return content
             }
           }
         }
       }
       
-      // Caso 3: buscar HTML em qualquer lugar do artifacts (string search)
-      const artifactsStr = JSON.stringify(artifacts)
-      const htmlMatch = artifactsStr.match(/<html[\s\S]*?<\/html>/i)
+      // Caso 3: buscar HTML em qualquer valor string do artifacts
+      const htmlMatch = findInStringValues(artifacts, text => extractHTMLDocument(text, HTML_OPEN_REGEX))
       if (htmlMatch) {
-        // Decodificar possíveis escapes JSON
-        return htmlMatch[0].replace(/\\"/g, '"').replace(/\\n/g, '\n')
+        return htmlMatch
       }
       
       // Caso 4: buscar por DOCTYPE HTML
-      const doctypeMatch = artifactsStr.match(/<!DOCTYPE html[\s\S]*?<\/html>/i)
+      const doctypeMatch = findInStringValues(artifacts, text => extractHTMLDocument(text, DOCTYPE_OPEN_REGEX))
       if (doctypeMatch) {
-        return doctypeMatch[0].replace(/\\"/g, '"').replace(/\\n/g, '\n')
+        return doctypeMatch
       }
       
       return null
@@ -991,120 +1100,50 @@ class ChatController {
     }
   }
 
-  // 🚨 FUNÇÃO MELHORADA: Também buscar no content das mensagens como fallback
-  private extractHTMLFromMessage(content: string, metadata: any): string | null {
-    // Primeiro, verificar se o conteúdo já é HTML
-    if (content && (content.includes('<html') || content.includes('<!DOCTYPE'))) {
-      return content
-    }
-    
-    // Depois, usar a nova função de artifacts
-    return this.extractHTMLFromArtifacts(metadata)
-  }
-
   // 🎯 NOVO MÉTODO: Detecção precisa de operação
   private detectOperation(
     message: string, 
     existingHTML: string | null, 
-    frontendOperation?: string,
-    context?: any
-  ): {
-    operation: 'create' | 'edit' | 'analyze',
-    hasHTML: boolean,
-    preserveStructure: boolean,
-    confidence: number
-  } {
+    frontendOperation: string | undefined,
+    context: Readonly<ChatAIContext>
+  ): Readonly<OperationDetection> {
     const hasHTML = !!(existingHTML && existingHTML.length > 100)
-    let confidence = 0
-    let operation: 'create' | 'edit' | 'analyze' = 'create'
+    
+    // As regras são avaliadas em ordem de prioridade e a primeira que decide
+    // encerra a detecção, devolvendo um resultado pré-montado (nenhum objeto criado por requisição);
+    // a regex de palavras-chave só roda quando nada mais barato decidiu
     
     // 🔥 PRIORIDADE 1: Operação explícita do frontend (95% confiança)
-    if (frontendOperation === 'edit' || frontendOperation === 'create') {
-      confidence = 95
-      operation = frontendOperation as 'create' | 'edit'
-      
+    if (frontendOperation === 'edit') {
       // Se frontend diz 'edit' mas não há HTML, forçar 'create'
-      if (frontendOperation === 'edit' && !hasHTML) {
-        operation = 'create'
-        confidence = 80
-      }
-      
-      return {
-        operation,
-        hasHTML,
-        preserveStructure: operation === 'edit',
-        confidence
-      }
+      return hasHTML ? FRONTEND_EDIT_DETECTION : FRONTEND_EDIT_WITHOUT_HTML_DETECTION
+    }
+    if (frontendOperation === 'create') {
+      return hasHTML ? FRONTEND_CREATE_WITH_HTML_DETECTION : FRONTEND_CREATE_DETECTION
     }
     
     // 🔥 PRIORIDADE 2: Elemento específico do contexto (90% confiança)
-    if (context?.targetElement?.originalText && context?.targetElement?.newText) {
-      return {
-        operation: 'edit',
-        hasHTML,
-        preserveStructure: true,
-        confidence: 90
-      }
+    if (context.targetElement?.originalText && context.targetElement.newText) {
+      return hasHTML ? TARGET_ELEMENT_WITH_HTML_DETECTION : TARGET_ELEMENT_DETECTION
     }
     
     // 🔥 PRIORIDADE 3: Se não há HTML, é criação (85% confiança)
     if (!hasHTML) {
-      return {
-        operation: 'create',
-        hasHTML: false,
-        preserveStructure: false,
-        confidence: 85
-      }
+      return NO_HTML_DETECTION
     }
     
     // 🔥 PRIORIDADE 4: Análise de palavras-chave rigorosa (80% confiança)
-    const isEditRequest = this.containsEditKeywords(message)
-    if (isEditRequest) {
-      return {
-        operation: 'edit',
-        hasHTML,
-        preserveStructure: true,
-        confidence: 80
-      }
+    if (this.containsEditKeywords(message)) {
+      return EDIT_KEYWORDS_DETECTION
     }
     
     // 🔥 DEFAULT: Com HTML existente mas sem indicação clara = analyze
-    if (hasHTML) {
-      return {
-        operation: 'analyze',
-        hasHTML,
-        preserveStructure: true,
-        confidence: 60
-      }
-    }
-    
-    // 🔥 FALLBACK: Create
-    return {
-      operation: 'create',
-      hasHTML,
-      preserveStructure: false,
-      confidence: 50
-    }
+    return ANALYZE_DETECTION
   }
 
   // 🎯 NOVO MÉTODO: Verificar palavras-chave de edição
   private containsEditKeywords(message: string): boolean {
-    const editKeywords = [
-      // Português - palavras específicas
-      'altere', 'modifique', 'mude', 'substitua', 'corrija', 'atualize', 
-      'troque', 'edite', 'ajuste', 'refaça', 'conserte',
-      
-      // Inglês - palavras específicas  
-      'change', 'modify', 'update', 'edit', 'fix', 'correct', 'adjust',
-      'replace', 'alter', 'revise',
-      
-      // Frases específicas
-      'muda para', 'troca por', 'substitui por', 'altera para',
-      'change to', 'replace with', 'update to'
-    ]
-    
-    const lowerMessage = message.toLowerCase()
-    return editKeywords.some(keyword => lowerMessage.includes(keyword.toLowerCase()))
+    return EDIT_KEYWORDS_REGEX.test(message)
   }
 }
 
@@ -1,5 +1,6 @@
 import { Response } from 'express'
 import { validationResult } from 'express-validator'
+import { performance } from 'perf_hooks'
 import { HTTP_STATUS } from '../utils/constants'
 import { logger } from '../utils/logger'
 import { supabase } from '../config/supabase.config'
@@ -94,9 +95,9 @@ const generateEmailDirect = async (req: AuthRequest, res: Response): Promise<voi
         userId
       }
 
-      const startTime = Date.now()
+      const startTime = performance.now()
       const iaResponse = await iaService.generateHTML(iaRequest)
-      const processingTime = Date.now() - startTime
+      const processingTime = Math.round(performance.now() - startTime)
 
       const estimatedTokens = Math.ceil(iaResponse.html.length / 4)
       const estimatedCost = estimatedTokens * 0.000003
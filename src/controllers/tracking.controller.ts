@@ -4,6 +4,14 @@
 import { Request, Response } from 'express';
 import { facebookConversionsService, FacebookEventData, TrackingResult } from '../services/facebook-conversions.service';
 
+const LOCALHOST_IPS: ReadonlySet<string> = new Set(['127.0.0.1', '::1', '::ffff:127.0.0.1']);
+
+// Primeiro endereço do X-Forwarded-For (equivalente a split(',')[0].trim(), sem montar o array)
+function firstForwardedAddress(forwarded: string): string {
+  const comma = forwarded.indexOf(',');
+  return (comma === -1 ? forwarded : forwarded.slice(0, comma)).trim();
+}
+
 class TrackingController {
   /**
    * Endpoint genérico para tracking de eventos
@@ -23,11 +31,11 @@ class TrackingController {
       const getClientIP = (req: Request): string | undefined => {
         const forwarded = req.headers['x-forwarded-for'];
         const clientIP = typeof forwarded === 'string' 
-          ? forwarded.split(',')[0].trim()
+          ? firstForwardedAddress(forwarded)
           : req.connection.remoteAddress || req.socket.remoteAddress;
         
         // Filter out localhost/internal IPs for better matching
-        if (clientIP && !['127.0.0.1', '::1', '::ffff:127.0.0.1'].includes(clientIP)) {
+        if (clientIP && !LOCALHOST_IPS.has(clientIP)) {
           return clientIP;
         }
         return undefined;
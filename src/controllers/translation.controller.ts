@@ -1,12 +1,24 @@
 import { Request, Response, NextFunction } from 'express'
 import { translationService, TranslationRequest } from '../services/translation.service'
 import { logger } from '../utils/logger'
-import { ApiError } from '../utils/api-error'
+import { HTTP_STATUS } from '../utils/constants'
+
+const SUPPORTED_LANGUAGES: ReadonlySet<string> = new Set(['pt', 'en'])
 
 interface AuthRequest extends Request {
   userId?: string
 }
 
+// Entrada inválida é respondida direto com 400, sem criar um ApiError (com
+// captura de stack) só para repassá-lo ao errorHandler - que, por não ler o statusCode do
+// erro, acabava respondendo 500
+function sendValidationError(res: Response, message: string): void {
+  res.status(HTTP_STATUS.BAD_REQUEST).json({
+    success: false,
+    message
+  })
+}
+
 export class TranslationController {
   
   // POST /api/translation/translate
@@ -16,19 +28,23 @@ export class TranslationController {
 
       // Validation
       if (!text || typeof text !== 'string') {
-        throw new ApiError('Texto é obrigatório e deve ser uma string', 400)
+        sendValidationError(res, 'Texto é obrigatório e deve ser uma string')
+        return
       }
 
-      if (!fromLanguage || !['pt', 'en'].includes(fromLanguage)) {
-        throw new ApiError('fromLanguage deve ser "pt" ou "en"', 400)
+      if (!fromLanguage || !SUPPORTED_LANGUAGES.has(fromLanguage)) {
+        sendValidationError(res, 'fromLanguage deve ser "pt" ou "en"')
+        return
       }
 
-      if (!toLanguage || !['pt', 'en'].includes(toLanguage)) {
-        throw new ApiError('toLanguage deve ser "pt" ou "en"', 400)
+      if (!toLanguage || !SUPPORTED_LANGUAGES.has(toLanguage)) {
+        sendValidationError(res, 'toLanguage deve ser "pt" ou "en"')
+        return
       }
 
       if (text.length > 1000) {
-        throw new ApiError('Texto muito longo. Máximo 1000 caracteres', 400)
+        sendValidationError(res, 'Texto muito longo. Máximo 1000 caracteres')
+        return
       }
 
       const request: TranslationRequest = {
@@ -57,19 +73,23 @@ export class TranslationController {
 
       // Validation
       if (!projectName || typeof projectName !== 'string') {
-        throw new ApiError('projectName é obrigatório e deve ser uma string', 400)
+        sendValidationError(res, 'projectName é obrigatório e deve ser uma string')
+        return
       }
 
-      if (!fromLanguage || !['pt', 'en'].includes(fromLanguage)) {
-        throw new ApiError('fromLanguage deve ser "pt" ou "en"', 400)
+      if (!fromLanguage || !SUPPORTED_LANGUAGES.has(fromLanguage)) {
+        sendValidationError(res, 'fromLanguage deve ser "pt" ou "en"')
+        return
       }
 
-      if (!toLanguage || !['pt', 'en'].includes(toLanguage)) {
-        throw new ApiError('toLanguage deve ser "pt" ou "en"', 400)
+      if (!toLanguage || !SUPPORTED_LANGUAGES.has(toLanguage)) {
+        sendValidationError(res, 'toLanguage deve ser "pt" ou "en"')
+        return
       }
 
       if (projectName.length > 200) {
-        throw new ApiError('Nome do projeto muito longo. Máximo 200 caracteres', 400)
+        sendValidationError(res, 'Nome do projeto muito longo. Máximo 200 caracteres')
+        return
       }
 
       const translatedName = await translationService.translateProjectName(
@@ -99,11 +119,13 @@ export class TranslationController {
       const { projectId, language } = req.params
 
       if (!projectId || !language) {
-        throw new ApiError('projectId e language são obrigatórios', 400)
+        sendValidationError(res, 'projectId e language são obrigatórios')
+        return
       }
 
-      if (!['pt', 'en'].includes(language)) {
-        throw new ApiError('language deve ser "pt" ou "en"', 400)
+      if (!SUPPORTED_LANGUAGES.has(language)) {
+        sendValidationError(res, 'language deve ser "pt" ou "en"')
+        return
       }
 
       // TODO: Implement project translation retrieval from database
@@ -130,25 +152,30 @@ export class TranslationController {
 
       // Validation
       if (!Array.isArray(texts) || texts.length === 0) {
-        throw new ApiError('texts deve ser um array não vazio', 400)
+        sendValidationError(res, 'texts deve ser um array não vazio')
+        return
       }
 
       if (texts.length > 10) {
-        throw new ApiError('Máximo 10 textos por lote', 400)
+        sendValidationError(res, 'Máximo 10 textos por lote')
+        return
       }
 
-      if (!fromLanguage || !['pt', 'en'].includes(fromLanguage)) {
-        throw new ApiError('fromLanguage deve ser "pt" ou "en"', 400)
+      if (!fromLanguage || !SUPPORTED_LANGUAGES.has(fromLanguage)) {
+        sendValidationError(res, 'fromLanguage deve ser "pt" ou "en"')
+        return
       }
 
-      if (!toLanguage || !['pt', 'en'].includes(toLanguage)) {
-        throw new ApiError('toLanguage deve ser "pt" ou "en"', 400)
+      if (!toLanguage || !SUPPORTED_LANGUAGES.has(toLanguage)) {
+        sendValidationError(res, 'toLanguage deve ser "pt" ou "en"')
+        return
       }
 
       // Validate each text
       for (const text of texts) {
         if (!text || typeof text !== 'string' || text.length > 1000) {
-          throw new ApiError('Cada texto deve ser uma string com máximo 1000 caracteres', 400)
+          sendValidationError(res, 'Cada texto deve ser uma string com máximo 1000 caracteres')
+          return
         }
       }
 
@@ -8,8 +8,81 @@ import { asyncHandler } from '../middleware/error.middleware'
 import { logger } from '../utils/logger'
 
 // ✅ NOVO: Type guard para validar tipos de projeto
+const VALID_PROJECT_TYPES: ReadonlySet<string> = new Set(['campaign', 'newsletter', 'transactional', 'notification', 'other'])
+
 function isValidProjectType(type: string): type is 'campaign' | 'newsletter' | 'transactional' | 'notification' | 'other' {
-  return ['campaign', 'newsletter', 'transactional', 'notification', 'other'].includes(type)
+  return VALID_PROJECT_TYPES.has(type)
+}
+
+const INDUSTRIES = Object.freeze([
+  { id: 'technology', name: 'Tecnologia' },
+  { id: 'ecommerce', name: 'E-commerce' },
+  { id: 'health', name: 'Saúde' },
+  { id: 'education', name: 'Educação' },
+  { id: 'finance', name: 'Finanças' },
+  { id: 'marketing', name: 'Marketing' },
+  { id: 'real-estate', name: 'Imóveis' },
+  { id: 'food', name: 'Alimentação' },
+  { id: 'fashion', name: 'Moda' },
+  { id: 'other', name: 'Outros' }
+])
+
+interface TemplateSummary {
+  readonly id: string
+  readonly name: string
+  readonly industry: string
+  readonly type: string
+  readonly content: string
+}
+
+const TEMPLATES: readonly TemplateSummary[] = Object.freeze([
+  { 
+    id: 'promotional-1', 
+    name: 'Promoção de Produto',
+    industry: 'ecommerce',
+    type: 'campaign',
+    content: 'Template promocional básico'
+  },
+  { 
+    id: 'newsletter-1', 
+    name: 'Newsletter Semanal',
+    industry: 'marketing',
+    type: 'newsletter',
+    content: 'Template de newsletter'
+  },
+  { 
+    id: 'welcome-1', 
+    name: 'Email de Boas-vindas',
+    industry: 'general',
+    type: 'transactional',
+    content: 'Template de boas-vindas'
+  }
+])
+
+const TEMPLATE_INDUSTRIES: ReadonlySet<string> = new Set(TEMPLATES.map(t => t.industry))
+const NO_TEMPLATES: readonly TemplateSummary[] = Object.freeze([])
+
+// Resultado filtrado por combinação (industry, type) - o conjunto de chaves é limitado
+// às indústrias conhecidas x tipos válidos, então o cache não cresce sem limite
+const filteredTemplatesCache = new Map<string, readonly TemplateSummary[]>()
+
+function getFilteredTemplates(industry?: string, type?: string): readonly TemplateSummary[] {
+  if (industry !== undefined && !TEMPLATE_INDUSTRIES.has(industry)) {
+    return NO_TEMPLATES
+  }
+
+  const key = `${industry ?? ''}|${type ?? ''}`
+  let templates = filteredTemplatesCache.get(key)
+
+  if (!templates) {
+    templates = Object.freeze(TEMPLATES.filter(t =>
+      (industry === undefined || t.industry === industry) &&
+      (type === undefined || t.type === type)
+    ))
+    filteredTemplatesCache.set(key, templates)
+  }
+
+  return templates
 }
 
 class UserController {
@@ -299,22 +372,9 @@ class UserController {
 
   getIndustries = asyncHandler(async (_req: AuthRequest, res: Response): Promise<void> => {
     // ✅ FALLBACK: Como a tabela industries pode não existir, usar lista hardcoded
-    const industries = [
-      { id: 'technology', name: 'Tecnologia' },
-      { id: 'ecommerce', name: 'E-commerce' },
-      { id: 'health', name: 'Saúde' },
-      { id: 'education', name: 'Educação' },
-      { id: 'finance', name: 'Finanças' },
-      { id: 'marketing', name: 'Marketing' },
-      { id: 'real-estate', name: 'Imóveis' },
-      { id: 'food', name: 'Alimentação' },
-      { id: 'fashion', name: 'Moda' },
-      { id: 'other', name: 'Outros' }
-    ]
-
     res.json({
       success: true,
-      data: { industries }
+      data: { industries: INDUSTRIES }
     })
   })
 
@@ -324,39 +384,10 @@ class UserController {
     const type = req.query.type as string | undefined
 
     // ✅ FALLBACK: Como a tabela templates pode não existir, usar lista hardcoded
-    let templates = [
-      { 
-        id: 'promotional-1', 
-        name: 'Promoção de Produto',
-        industry: 'ecommerce',
-        type: 'campaign',
-        content: 'Template promocional básico'
-      },
-      { 
-        id: 'newsletter-1', 
-        name: 'Newsletter Semanal',
-        industry: 'marketing',
-        type: 'newsletter',
-        content: 'Template de newsletter'
-      },
-      { 
-        id: 'welcome-1', 
-        name: 'Email de Boas-vindas',
-        industry: 'general',
-        type: 'transactional',
-        content: 'Template de boas-vindas'
-      }
-    ]
-
-    // Filtrar por industry se fornecido
-    if (industry && typeof industry === 'string') {
-      templates = templates.filter(t => t.industry === industry)
-    }
-
-    // Filtrar por type se fornecido e válido
-    if (type && typeof type === 'string' && isValidProjectType(type)) {
-      templates = templates.filter(t => t.type === type)
-    }
+    const templates = getFilteredTemplates(
+      industry && typeof industry === 'string' ? industry : undefined,
+      type && typeof type === 'string' && isValidProjectType(type) ? type : undefined
+    )
 
     res.json({
       success: true,
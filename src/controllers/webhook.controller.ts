@@ -1,4 +1,5 @@
 import { Request, Response } from 'express'
+import { performance } from 'perf_hooks'
 import { AuthRequest } from '../types/auth.types'
 import { webhookService } from '../services/webhook.service'
 import { HTTP_STATUS } from '../utils/constants'
@@ -10,7 +11,7 @@ class WebhookController {
    * Endpoint: POST /api/v1/webhooks/stripe
    */
   async handleStripeWebhook(req: Request, res: Response): Promise<void> {
-    const startTime = Date.now()
+    const startTime = performance.now()
     const requestId = req.headers['x-request-id'] || 'unknown'
 
     try {
@@ -43,7 +44,7 @@ class WebhookController {
       // Processar evento com idempotência e retry
       await webhookService.processWebhookEvent(event)
 
-      const processingTime = Date.now() - startTime
+      const processingTime = Math.round(performance.now() - startTime)
 
       logger.info('Webhook processed successfully', {
         requestId,
@@ -61,7 +62,7 @@ class WebhookController {
       })
 
     } catch (error: any) {
-      const processingTime = Date.now() - startTime
+      const processingTime = Math.round(performance.now() - startTime)
 
       logger.error('Webhook processing failed', {
         requestId,
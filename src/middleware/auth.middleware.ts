@@ -1,4 +1,5 @@
 import { Response, NextFunction } from 'express'
+import { performance } from 'perf_hooks'
 import { AuthRequest } from '../types/auth.types'
 import { HTTP_STATUS } from '../utils/constants'
 import { logger } from '../utils/logger'
@@ -7,6 +8,40 @@ import subscriptionService from '../services/subscription.service'
 import authTokenService from '../services/auth-token.service'
 import secureDbService from '../services/secure-db.service'
 
+const PROJECT_LIMITS_BY_PLAN: Readonly<Record<string, number>> = Object.freeze({
+  free: 3,
+  starter: 50,
+  enterprise: 100,
+  unlimited: 999999
+})
+
+const FEATURE_NAMES: Readonly<Record<string, string>> = Object.freeze({
+  folders: 'Pastas',
+  multi_user: 'Multi-usuário',
+  html_export: 'Exportação de HTML',
+  email_preview: 'Visualização de email'
+})
+
+// Equivalente a authHeader.split(' ')[1] localizando os dois delimitadores
+// com indexOf, sem montar o array de partes a cada requisição
+function extractBearerToken(authHeader?: string): string | undefined {
+  if (!authHeader) return undefined
+
+  const start = authHeader.indexOf(' ') + 1
+  if (start === 0) return undefined
+
+  const end = authHeader.indexOf(' ', start)
+  return end === -1 ? authHeader.slice(start) : authHeader.slice(start, end)
+}
+
+// Profile e estado da assinatura lado a lado, em um objeto de formato fixo -
+// o middleware só lê alguns campos, então não há por que copiar todas as colunas do profile
+// para um objeto novo (spread) a cada requisição autenticada
+interface ProfileWithSubscription {
+  profile: any
+  subscriptionState: any
+}
+
 export const authenticateToken = async (
   req: AuthRequest,
   res: Response,
@@ -15,7 +50,7 @@ export const authenticateToken = async (
   try {
     // 1. Tentar obter access token do header Authorization
     const authHeader = req.headers.authorization
-    let accessToken = authHeader && authHeader.split(' ')[1]
+    let accessToken = extractBearerToken(authHeader)
 
     // 2. Se não houver no header, tentar refresh automático via cookie
     if (!accessToken) {
@@ -65,8 +100,8 @@ export const authenticateToken = async (
           if (newTokenPayload) {
             setCookies(res, tokenPair)
             // Continue com o novo token
-            const profile = await getProfileWithSubscription(newTokenPayload.userId)
-            req.user = createUserObject(newTokenPayload, profile)
+            const userProfile = await getProfileWithSubscription(newTokenPayload.userId)
+            req.user = createUserObject(newTokenPayload, userProfile)
             logger.info('✅ [AUTH] User authenticated via refresh:', { userId: newTokenPayload.userId })
             next()
             return
@@ -85,10 +120,10 @@ export const authenticateToken = async (
     }
 
     // 4. 🚀 OTIMIZAÇÃO CRÍTICA: Buscar profile com fallback inteligente
-    let profile: any
+    let userProfile: ProfileWithSubscription
     
     try {
-      profile = await getProfileWithSubscription(tokenPayload.userId)
+      userProfile = await getProfileWithSubscription(tokenPayload.userId)
     } catch (error: any) {
       // 🎯 FASE 1C: Background user initialization - não bloquear request principal
       if (error?.message?.includes('Profile not found')) {
@@ -97,7 +132,7 @@ export const authenticateToken = async (
         })
         
         // 🚀 PERFORMANCE BOOST: Return immediately with basic profile
-        profile = createBasicProfile(tokenPayload)
+        userProfile = createBasicProfile(tokenPayload)
         
         // 🔥 BACKGROUND TASK: Initialize user asynchronously (não bloqueia response)
         setImmediate(async () => {
@@ -122,13 +157,13 @@ export const authenticateToken = async (
       }
     }
     
-    req.user = createUserObject(tokenPayload, profile)
+    req.user = createUserObject(tokenPayload, userProfile)
 
     if (process.env.NODE_ENV === 'development') {
       logger.debug('✅ [AUTH] User authenticated:', {
         userId: tokenPayload.userId,
         email: tokenPayload.email,
-        subscription: profile.subscription
+        subscription: userProfile.profile.subscription
       })
     }
 
@@ -163,7 +198,7 @@ export const authenticateToken = async (
 }
 
 // ✅ OTIMIZAÇÃO CRÍTICA: Helper function with PARALLEL queries + CACHE
-async function getProfileWithSubscription(userId: string) {
+async function getProfileWithSubscription(userId: string): Promise<ProfileWithSubscription> {
   try {
     // 🚀 STEP 1: Tentar cache primeiro (evita DB queries)
     const cachedProfile = authTokenService.getCachedProfile(userId)
@@ -173,15 +208,12 @@ async function getProfileWithSubscription(userId: string) {
       if (process.env.NODE_ENV === 'development') {
         logger.debug('⚡ [AUTH-PERF] Profile loaded from cache (0ms)', { userId })
       }
-      return {
-        ...cachedProfile,
-        subscriptionState: cachedUsage
-      }
+      return { profile: cachedProfile, subscriptionState: cachedUsage }
     }
 
     // 🚀 STEP 2: Se cache parcial, usar o que tem e buscar o resto
     if (cachedProfile || cachedUsage) {
-      const startTime = Date.now()
+      const startTime = performance.now()
       
       const [profile, subscriptionState] = await Promise.all([
         cachedProfile || secureDbService.getUserProfile(userId),
@@ -196,19 +228,16 @@ async function getProfileWithSubscription(userId: string) {
       if (!cachedProfile) authTokenService.setCachedProfile(userId, profile)
       if (!cachedUsage) authTokenService.setCachedUsage(userId, subscriptionState)
 
-      const responseTime = Date.now() - startTime
+      const responseTime = Math.round(performance.now() - startTime)
       if (process.env.NODE_ENV === 'development') {
         logger.debug(`⚡ [AUTH-PERF] Profile partial cache hit (${responseTime}ms)`, { userId })
       }
 
-      return {
-        ...profile,
-        subscriptionState
-      }
+      return { profile, subscriptionState }
     }
 
     // 🚀 STEP 3: Cache miss - buscar tudo em paralelo
-    const startTime = Date.now()
+    const startTime = performance.now()
     
     const [profile, subscriptionState] = await Promise.all([
       secureDbService.getUserProfile(userId),
@@ -223,15 +252,12 @@ async function getProfileWithSubscription(userId: string) {
     authTokenService.setCachedProfile(userId, profile)
     authTokenService.setCachedUsage(userId, subscriptionState)
 
-    const responseTime = Date.now() - startTime
+    const responseTime = Math.round(performance.now() - startTime)
     if (process.env.NODE_ENV === 'development') {
       logger.debug(`⚡ [AUTH-PERF] Profile cache miss (${responseTime}ms)`, { userId })
     }
 
-    return {
-      ...profile,
-      subscriptionState
-    }
+    return { profile, subscriptionState }
   } catch (error: any) {
     logger.debug('🔍 [AUTH-PERF] getProfileWithSubscription error:', { userId, error: error?.message || 'Unknown error' })
     throw error
@@ -239,27 +265,24 @@ async function getProfileWithSubscription(userId: string) {
 }
 
 // 🚀 OTIMIZAÇÃO: Helper function to create basic profile for new users
-function createBasicProfile(tokenPayload: any) {
+function createBasicProfile(tokenPayload: any): ProfileWithSubscription {
+  const now = new Date().toISOString()
   const basicProfile = {
     id: tokenPayload.userId,
     email: tokenPayload.email,
     name: tokenPayload.email?.split('@')[0] || 'Usuário',
     subscription: 'free', // Start with free plan
-    subscriptionState: {
-      creditsAvailable: 3, // Default free credits
-      planType: 'free'
-    },
     active_organization_id: null,
     api_usage_limit: null,
     avatar: null,
     billing_cycle_day: null,
     preferences: null,
-    created_at: new Date().toISOString(),
-    updated_at: new Date().toISOString(),
+    created_at: now,
+    updated_at: now,
     free_requests_limit: 3,
     free_requests_used: 0,
     is_lifetime_free: true,
-    subscription_started_at: new Date().toISOString()
+    subscription_started_at: now
   }
   
   logger.debug('[AUTH-PERF] Created basic profile for immediate response', {
@@ -267,17 +290,23 @@ function createBasicProfile(tokenPayload: any) {
     email: tokenPayload.email
   })
   
-  return basicProfile
+  return {
+    profile: basicProfile,
+    subscriptionState: {
+      creditsAvailable: 3, // Default free credits
+      planType: 'free'
+    }
+  }
 }
 
 // Helper function to create user object
-function createUserObject(tokenPayload: any, profile: any) {
+function createUserObject(tokenPayload: any, { profile, subscriptionState }: ProfileWithSubscription) {
   return {
     id: tokenPayload.userId,
     email: tokenPayload.email,
     name: profile.name,
     subscription: profile.subscription || 'free',
-    credits: profile.subscriptionState?.creditsAvailable || 0,
+    credits: subscriptionState?.creditsAvailable || 0,
     created_at: profile.created_at || undefined,
     email_verified: true // JWT tokens are only issued for verified users
   }
@@ -391,14 +420,7 @@ export const checkProjectLimit = async (
     }
 
     // Obter limite de projetos baseado no plano
-    const planLimits: Record<string, number> = {
-      free: 3,
-      starter: 50,
-      enterprise: 100,
-      unlimited: 999999
-    }
-
-    const maxProjects = planLimits[req.user.subscription] || 3
+    const maxProjects = PROJECT_LIMITS_BY_PLAN[req.user.subscription] || 3
 
     const query = supabaseAdmin
       .from('projects')
@@ -450,16 +472,9 @@ export const requireFeature = (feature: string) => {
       const canUse = await subscriptionService.canUseFeature(req.user.id, feature)
 
       if (!canUse) {
-        const featureNames: Record<string, string> = {
-          folders: 'Pastas',
-          multi_user: 'Multi-usuário',
-          html_export: 'Exportação de HTML',
-          email_preview: 'Visualização de email'
-        }
-
         res.status(HTTP_STATUS.FORBIDDEN).json({
           success: false,
-          message: `Recurso "${featureNames[feature] || feature}" não disponível no seu plano`,
+          message: `Recurso "${FEATURE_NAMES[feature] || feature}" não disponível no seu plano`,
           error: {
             code: 'FEATURE_NOT_AVAILABLE',
             feature: feature,
@@ -5,6 +5,9 @@ import { supabase } from '../config/supabase.config'
 import { HTTP_STATUS } from '../utils/constants'
 import { logger } from '../utils/logger'
 
+// Emails com bypass de limite - regex case-insensitive pré-compilada (sem lista nem toLowerCase por requisição)
+const BYPASSED_EMAILS_REGEX = /^(?:gabriel@exemplo\.com|admin@mailtrendz\.com|dev@mailtrendz\.com)$/i
+
 /**
  * Middleware para verificar créditos de IA - Sistema Unificado
  */
@@ -171,8 +174,7 @@ export const checkProjectLimit = async (
       }
       
       // Bypass adicional para emails específicos
-      const bypassedEmails = ['gabriel@exemplo.com', 'admin@mailtrendz.com', 'dev@mailtrendz.com']
-      if (profile?.email && bypassedEmails.includes(profile.email.toLowerCase())) {
+      if (profile?.email && BYPASSED_EMAILS_REGEX.test(profile.email)) {
         logger.info('[Credits Middleware] Emergency bypass for hardcoded email:', profile.email)
         next()
         return
@@ -1,11 +1,13 @@
 import { Request, Response, NextFunction } from 'express'
+import { performance } from 'perf_hooks'
 import { logger } from '../utils/logger'
 
 export const performanceLogger = (req: Request, res: Response, next: NextFunction) => {
-  const startTime = Date.now()
+  // Relógio monotônico de alta resolução: não é afetado por ajustes no relógio do sistema
+  const startTime = performance.now()
   
   res.on('finish', () => {
-    const duration = Date.now() - startTime
+    const duration = Math.round(performance.now() - startTime)
     const { method, url, ip } = req
     const { statusCode } = res
     
@@ -15,6 +15,14 @@ interface RateLimitMetrics {
 
 const metrics = new Map<string, RateLimitMetrics>()
 
+// Totais mantidos incrementalmente junto com as métricas de cada tipo - o resumo
+// lê os acumulados em vez de copiar o Map e somar todas as entradas a cada consulta
+const metricTotals = { requests: 0, blocked: 0 }
+
+export const MONITORING_PATHS: ReadonlySet<string> = new Set(['/health', '/status', '/metrics', '/test-connection'])
+// Em desenvolvimento basta o trecho aparecer em qualquer parte do caminho (uma única busca)
+const DEV_SKIP_PATH_REGEX = /\/(?:health|status|metrics|test-connection|debug)/
+
 // 🎯 SMART RATE LIMITING: Context-aware limits
 const RATE_LIMIT_TIERS = {
   development: {
@@ -63,8 +71,7 @@ function createSmartRateLimiter(
     // 🚀 INTELLIGENT SKIP: Skip non-critical paths in development
     skip: (req) => {
       if (isDevelopment) {
-        const skipPaths = ['/health', '/status', '/metrics', '/test-connection', '/debug']
-        const shouldSkip = skipPaths.some(path => req.path.includes(path))
+        const shouldSkip = DEV_SKIP_PATH_REGEX.test(req.path)
         if (shouldSkip) {
           logger.debug(`🚀 [RATE-LIMIT-PERF] Skipping ${name} rate limit for dev path:`, req.path)
         }
@@ -77,6 +84,7 @@ function createSmartRateLimiter(
       // Update metrics
       const metric = metrics.get(name) || { requests: 0, blocked: 0, resetTime: Date.now() + config.windowMs }
       metric.blocked++
+      metricTotals.blocked++
       metrics.set(name, metric)
       
       logger.warn(`🔥 [RATE-LIMIT-${name.toUpperCase()}] Rate limit exceeded:`, {
@@ -155,8 +163,7 @@ export const aiGenerationLimiter = rateLimit({
   },
   skip: (req) => {
     // SEMPRE pular rate limiting para endpoints de monitoramento
-    const skipPaths = ['/health', '/status', '/metrics', '/test-connection']
-    return skipPaths.some(path => req.path === path)
+    return MONITORING_PATHS.has(req.path)
   },
   keyGenerator: (req) => {
     const userId = (req as any).user?.id
@@ -306,15 +313,14 @@ export const endpointSpamProtection = (maxRequests: number = 10, windowMs: numbe
 
 // 📊 PERFORMANCE MONITORING: Get rate limiting metrics
 export function getRateLimitMetrics() {
-  const metricsSnapshot = new Map(metrics)
   return {
     environment: isProduction ? 'production' : 'development',
-    metrics: Object.fromEntries(metricsSnapshot),
+    metrics: Object.fromEntries(metrics),
     timestamp: new Date().toISOString(),
     summary: {
-      totalBlocked: Array.from(metricsSnapshot.values()).reduce((sum, m) => sum + m.blocked, 0),
-      totalRequests: Array.from(metricsSnapshot.values()).reduce((sum, m) => sum + m.requests, 0),
-      activeTypes: metricsSnapshot.size
+      totalBlocked: metricTotals.blocked,
+      totalRequests: metricTotals.requests,
+      activeTypes: metrics.size
     }
   }
 }
@@ -325,6 +331,8 @@ setInterval(() => {
   for (const [key, metric] of metrics.entries()) {
     if (now > metric.resetTime) {
       // Reset metrics for expired windows
+      metricTotals.requests -= metric.requests
+      metricTotals.blocked -= metric.blocked
       metrics.set(key, {
         requests: 0,
         blocked: 0,
@@ -1,4 +1,5 @@
 import { Request, Response, NextFunction } from 'express'
+import { performance } from 'perf_hooks'
 import { logger } from '../utils/logger'
 
 /**
@@ -10,16 +11,17 @@ export const rawBodyParser = (req: Request, _res: Response, next: NextFunction):
   // e captura o body raw necessário para validação de assinatura
   
   if (req.path.includes('/webhooks/stripe')) {
-    let data = ''
+    // Os chunks ficam em bytes e são unidos uma única vez no final - sem
+    // decodificar para string e recodificar para Buffer (o que também podia alterar bytes
+    // inválidos em UTF-8 e invalidar a assinatura)
+    const chunks: Buffer[] = []
     
-    req.setEncoding('utf8')
-    
-    req.on('data', (chunk) => {
-      data += chunk
+    req.on('data', (chunk: Buffer) => {
+      chunks.push(chunk)
     })
     
     req.on('end', () => {
-      req.body = Buffer.from(data, 'utf8')
+      req.body = Buffer.concat(chunks)
       next()
     })
   } else {
@@ -202,7 +204,7 @@ export const webhookLogger = (req: Request, res: Response, next: NextFunction):
     return
   }
 
-  const startTime = Date.now()
+  const startTime = performance.now()
   const requestId = req.headers['x-request-id'] || `wh_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
 
   // Adicionar request ID ao request
@@ -221,7 +223,7 @@ export const webhookLogger = (req: Request, res: Response, next: NextFunction):
   // Interceptar response
   const originalSend = res.send
   res.send = function(data) {
-    const duration = Date.now() - startTime
+    const duration = Math.round(performance.now() - startTime)
     
     logger.info('Webhook request completed', {
       requestId,
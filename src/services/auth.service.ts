@@ -10,6 +10,31 @@ import { getRedirectUrl } from '../utils/url-helper'
 
 type Profile = Database['public']['Tables']['profiles']['Row']
 
+// As quatro classes de caractere da senha em uma única alternação compilada
+// no carregamento do módulo - uma varredura em vez de quatro regex separadas
+const PASSWORD_CHAR_CLASSES_REGEX = /([A-Z])|([a-z])|(\d)|[!@#$%^&*(),.?":{}|<>]/g
+const PASSWORD_HAS_UPPER = 1
+const PASSWORD_HAS_LOWER = 2
+const PASSWORD_HAS_NUMBER = 4
+const PASSWORD_HAS_SPECIAL = 8
+const PASSWORD_ALL_CLASSES = PASSWORD_HAS_UPPER | PASSWORD_HAS_LOWER | PASSWORD_HAS_NUMBER | PASSWORD_HAS_SPECIAL
+
+// Bits das classes presentes na senha; para assim que todas foram encontradas
+function scanPasswordCharClasses(password: string): number {
+  let found = 0
+  
+  PASSWORD_CHAR_CLASSES_REGEX.lastIndex = 0
+  let match: RegExpExecArray | null
+  while (found !== PASSWORD_ALL_CLASSES && (match = PASSWORD_CHAR_CLASSES_REGEX.exec(password)) !== null) {
+    found |= match[1] ? PASSWORD_HAS_UPPER
+      : match[2] ? PASSWORD_HAS_LOWER
+      : match[3] ? PASSWORD_HAS_NUMBER
+      : PASSWORD_HAS_SPECIAL
+  }
+  
+  return found
+}
+
 class AuthService {
   async register(userData: RegisterDto) {
     try {
@@ -497,10 +522,11 @@ class AuthService {
 
   static validatePasswordStrength(password: string) {
     const minLength = 8
-    const hasUpperCase = /[A-Z]/.test(password)
-    const hasLowerCase = /[a-z]/.test(password)
-    const hasNumbers = /\d/.test(password)
-    const hasSpecialChar = /[!@#$%^&*(),.?":{}|<>]/.test(password)
+    const charClasses = scanPasswordCharClasses(password)
+    const hasUpperCase = (charClasses & PASSWORD_HAS_UPPER) !== 0
+    const hasLowerCase = (charClasses & PASSWORD_HAS_LOWER) !== 0
+    const hasNumbers = (charClasses & PASSWORD_HAS_NUMBER) !== 0
+    const hasSpecialChar = (charClasses & PASSWORD_HAS_SPECIAL) !== 0
 
     const strength = {
       isValid: password.length >= minLength && hasUpperCase && hasLowerCase && hasNumbers,
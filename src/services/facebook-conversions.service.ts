@@ -6,6 +6,9 @@ const bizSdk = require('facebook-nodejs-business-sdk');
 const { FacebookAdsApi, ServerEvent, EventRequest, UserData, CustomData } = bizSdk;
 import * as CryptoJS from 'crypto-js';
 
+// Tudo que não é dígito ou '+' no telefone (espaços, traços, parênteses)
+const PHONE_NON_DIGIT_REGEX = /[^\d+]/g;
+
 export interface FacebookEventData {
   eventName: string;
   eventId?: string;
@@ -98,7 +101,7 @@ class FacebookConversionsService {
       // ✅ ENHANCED: Phone with proper formatting
       if (eventData.userPhone) {
         // Ensure phone is properly formatted (remove spaces, dashes, parentheses)
-        const cleanPhone = eventData.userPhone.replace(/[^\d+]/g, '');
+        const cleanPhone = eventData.userPhone.replace(PHONE_NON_DIGIT_REGEX, '');
         userData.setPhone(this.hashUserData(cleanPhone));
       }
       
@@ -1,7 +1,10 @@
 import axios, { AxiosInstance } from 'axios'
 import * as cheerio from 'cheerio'
+import { createHash } from 'crypto'
+import { performance } from 'perf_hooks'
 import { logger } from '../utils/logger'
-import { inlineStyles } from '../utils/cssInliner'
+import { keepAliveHttpAgent, keepAliveHttpsAgent } from '../config/http-agent.config'
+import { compileCSSRules, inlineStylesInDocument, InlineCSSRule } from '../utils/cssInliner'
 
 export interface IARequest {
   userInput: string
@@ -40,96 +43,53 @@ export interface IAResponse {
   }
 }
 
-class IAService {
-  private client: AxiosInstance
-  private apiKey: string
-  private model: string
-  private baseUrl: string
-  private maxConcurrent: number = 50
-
-  constructor() {
-    this.apiKey = process.env.OPENROUTER_API_KEY || ''
-    this.model = process.env.OPENROUTER_MODEL || 'anthropic/claude-3.5-sonnet'
-    this.baseUrl = process.env.OPENROUTER_BASE_URL || 'https://openrouter.ai/api/v1'
-    
-    if (!this.apiKey) {
-      logger.warn('OPENROUTER_API_KEY não configurada - serviço IA desabilitado')
-    }
-
-    this.client = axios.create({
-      baseURL: this.baseUrl,
-      timeout: 90000,
-      headers: {
-        'Authorization': `Bearer ${this.apiKey}`,
-        'Content-Type': 'application/json',
-        'HTTP-Referer': process.env.APP_URL || 'http://localhost:3000',
-        'X-Title': 'MailTrendz'
-      }
-    })
-
-    this.setupInterceptors()
+const MODERN_EMAIL_CSS = `
+  body { margin: 0; padding: 0; background-color: #f3f4f6; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; }
+  .email-container { max-width: 600px; margin: 0 auto; background-color: #f3f4f6; padding: 20px; }
+  .email-card { background: #ffffff; border-radius: 16px; padding: 40px; margin: 20px 0; box-shadow: 0 10px 40px rgba(0,0,0,0.12); border: 1px solid #e5e7eb; }
+  .email-header { text-align: center; margin-bottom: 32px; }
+  .email-title { font-size: 32px; font-weight: 800; color: #111827; margin-bottom: 12px; line-height: 1.2; }
+  .email-subtitle { font-size: 18px; color: #6b7280; margin-bottom: 32px; line-height: 1.5; }
+  .email-content { font-size: 16px; line-height: 1.7; color: #374151; margin-bottom: 24px; }
+  .email-button { display: inline-block; background: linear-gradient(135deg, #3b82f6 0%, #1d4ed8 100%); color: #ffffff !important; padding: 16px 40px; border-radius: 12px; text-decoration: none; font-weight: 700; font-size: 16px; margin: 24px 0; text-align: center; box-shadow: 0 4px 16px rgba(59,130,246,0.3); transition: transform 0.2s; }
+  .email-button:hover { transform: translateY(-2px); box-shadow: 0 8px 24px rgba(59,130,246,0.4); }
+  .email-footer { background: #f9fafb; border-radius: 12px; padding: 24px; margin-top: 32px; text-align: center; color: #6b7280; font-size: 14px; }
+  .benefits-list { background: #f8fafc; border-radius: 12px; padding: 24px; margin: 24px 0; }
+  .benefit-item { display: flex; align-items: center; margin-bottom: 12px; font-size: 16px; color: #374151; }
+  .benefit-check { color: #10b981; font-weight: 700; margin-right: 12px; font-size: 18px; }
+  @media (max-width: 600px) { 
+    .email-container { padding: 10px; } 
+    .email-card { padding: 24px; margin: 10px 0; }
+    .email-title { font-size: 26px; }
+    .email-button { padding: 14px 32px; font-size: 15px; }
   }
-
-  private setupInterceptors(): void {
-    this.client.interceptors.request.use(
-      (config) => {
-        logger.info(`IA REQUEST: ${config.method?.toUpperCase()} ${config.url}`)
-        return config
-      },
-      (error) => {
-        logger.error('IA Request error:', error.message)
-        return Promise.reject(error)
-      }
-    )
-
-    this.client.interceptors.response.use(
-      (response) => {
-        logger.info(`IA RESPONSE: ${response.config.method?.toUpperCase()} ${response.config.url} - SUCCESS`)
-        return response
-      },
-      (error) => {
-        logger.error('IA Response error:', error.message)
-        return Promise.reject(error)
-      }
-    )
+`
+
+// Marcadores procurados no <style> gerado pela IA: CSS moderno (border-radius ou .email-container) e regra de body
+const STYLE_MARKERS_REGEX = /border-radius|\.email-container|body/g
+const STYLE_HAS_MODERN_CSS = 1
+const STYLE_HAS_BODY_RULE = 2
+
+function scanStyleMarkers(css: string): number {
+  let found = 0
+  
+  STYLE_MARKERS_REGEX.lastIndex = 0
+  let match: RegExpExecArray | null
+  while (found !== (STYLE_HAS_MODERN_CSS | STYLE_HAS_BODY_RULE) && (match = STYLE_MARKERS_REGEX.exec(css)) !== null) {
+    found |= match[0] === 'body' ? STYLE_HAS_BODY_RULE : STYLE_HAS_MODERN_CSS
   }
+  
+  return found
+}
 
-  private getSystemPrompt(
-    hasExistingHTML: boolean,
-    isModification: boolean = false,
-    operation?: 'create' | 'edit' | 'analyze',
-    editContext?: any
-  ): string {
-    
-    // ✨ PROMPTS ULTRA-OTIMIZADOS POR OPERAÇÃO E CONTEXTO
-    const getOptimizedPrompt = () => {
-      // 🎯 MODO EDIÇÃO CIRÚRGICA - Para mudanças específicas
-      if (operation === 'edit' && editContext?.targetElement) {
-        const { targetElement, preserveStructure, priority } = editContext
-        
-        return `🎯 MODO EDIÇÃO CIRÚRGICA - ${priority?.toUpperCase() || 'BALANCED'} PRIORITY
+const MODERN_EMAIL_RULES: readonly InlineCSSRule[] = compileCSSRules(MODERN_EMAIL_CSS)
 
-🚨 CONTEXTO ESPECÍFICO:
-- Elemento alvo: ${targetElement.elementType || 'text'}
-- Texto original: "${targetElement.originalText}"
-- Novo texto: "${targetElement.newText}"
-- Preservar estrutura: ${preserveStructure ? 'SIM' : 'NÃO'}
-- Seletor: ${targetElement.selector || 'não especificado'}
+const BASE_BODY_CSS = '\nbody { font-size: 16px; line-height: 1.6; font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif; }'
 
-🔧 INSTRUÇÕES ULTRA-ESPECÍFICAS:
-1. Encontre EXATAMENTE o texto "${targetElement.originalText}" no HTML
-2. Substitua POR "${targetElement.newText}"
-3. NÃO altere cores, fontes, espaçamento ou qualquer CSS
-4. NÃO altere estrutura HTML (divs, tables, etc)
-5. NÃO altere outros textos ou conteúdos
-6. Mantenha classes CSS, IDs e atributos idênticos
+// ✨ PROMPTS ULTRA-OTIMIZADOS POR OPERAÇÃO E CONTEXTO
 
-${priority === 'speed' ? '⚡ MODO RÁPIDO: Mudança cirúrgica apenas no texto especificado' : ''}${priority === 'quality' ? '🎨 MODO QUALIDADE: Garanta que a mudança se integra perfeitamente' : ''}`
-      }
-      
-      // 🔧 MODO EDIÇÃO GERAL - Para HTML existente
-      if (operation === 'edit' && hasExistingHTML) {
-        return `🔧 MODO EDIÇÃO ULTRA-PRECISA - PRESERVAÇÃO TOTAL DA INTEGRIDADE VISUAL
+// 🔧 MODO EDIÇÃO GERAL - Para HTML existente
+const EDIT_MODE_PROMPT = `🔧 MODO EDIÇÃO ULTRA-PRECISA - PRESERVAÇÃO TOTAL DA INTEGRIDADE VISUAL
 
 🚨 REGRAS ABSOLUTAS INQUEBRÁVEIS:
 1. VOCÊ ESTÁ EDITANDO UM EMAIL EXISTENTE - JAMAIS RECRIE DO ZERO
@@ -157,21 +117,18 @@ ${priority === 'speed' ? '⚡ MODO RÁPIDO: Mudança cirúrgica apenas no texto
 - Reformatar ou "melhorar" o HTML existente
 
 ⚠️ LEMBRE-SE: Sua única missão é fazer a alteração específica pedida mantendo TUDO MAIS idêntico ao original!`
-      }
-      
-      // 📊 MODO ANÁLISE - Para melhorias sutis
-      if (operation === 'analyze' && hasExistingHTML) {
-        return `📊 MODO ANÁLISE - MELHORAR HTML EXISTENTE
+
+// 📊 MODO ANÁLISE - Para melhorias sutis
+const ANALYZE_MODE_PROMPT = `📊 MODO ANÁLISE - MELHORAR HTML EXISTENTE
         
 🎯 OBJETIVO: Melhorar o HTML existente mantendo sua essência
 - Analise o HTML atual e sugira melhorias sutis
 - Mantenha a estrutura e design principal
 - Foque em otimizações e refinamentos
 - Preserve o conteúdo existente`
-      }
-      
-      // 🆕 MODO CRIAÇÃO - Para novo email
-      return `🆕 MODO CRIAÇÃO - EMAIL HTML PROFISSIONAL E MODERNO
+
+// 🆕 MODO CRIAÇÃO - Para novo email
+const CREATE_MODE_PROMPT = `🆕 MODO CRIAÇÃO - EMAIL HTML PROFISSIONAL E MODERNO
 
 🎯 ESTRUTURA OBRIGATÓRIA:
 - Container principal com background cinza claro (#f3f4f6)
@@ -195,13 +152,15 @@ ${priority === 'speed' ? '⚡ MODO RÁPIDO: Mudança cirúrgica apenas no texto
 - Gradientes nos botões
 - Hierarquia visual clara
 - Contraste forte entre fundo e conteúdo`
-    }
-    
-    return `Você é um especialista em HTML para emails.
+
+// Partes fixas do prompt de sistema montadas uma única vez; por requisição só
+// resta concatenar o prompt do modo entre elas (usado a cada edição cirúrgica)
+const SYSTEM_PROMPT_HEAD = `Você é um especialista em HTML para emails.
 
 🚨 REGRA ABSOLUTA: RETORNE APENAS HTML PURO, NADA MAIS!
 
-${getOptimizedPrompt()}
+`
+const SYSTEM_PROMPT_RULES = `
 
 ⚠️ INSTRUÇÕES CRÍTICAS:
 1. RESPOSTA = APENAS HTML (nenhum texto antes/depois)
@@ -211,7 +170,8 @@ ${getOptimizedPrompt()}
 5. NUNCA use emojis no HTML final
 6. NUNCA use URLs de exemplo (example.com, etc)
 7. Se não há imagens fornecidas, NÃO inclua <img>
-8. ${isModification ? 'CRUCIAL: EDITE apenas o solicitado, preserve tudo mais' : 'Crie estrutura completa e profissional'}
+8. `
+const SYSTEM_PROMPT_FOOTER = `
 
 🚫 ABSOLUTAMENTE PROIBIDO:
 - Frases como "HTML gerado com sucesso", "Email modificado", etc
@@ -223,6 +183,404 @@ ${getOptimizedPrompt()}
 ✅ PERMITIDO:
 - APENAS HTML puro e válido
 - Modificações precisas quando solicitadas`
+const SYSTEM_PROMPT_TAILS: readonly [string, string] = [
+  SYSTEM_PROMPT_RULES + 'Crie estrutura completa e profissional' + SYSTEM_PROMPT_FOOTER,
+  SYSTEM_PROMPT_RULES + 'CRUCIAL: EDITE apenas o solicitado, preserve tudo mais' + SYSTEM_PROMPT_FOOTER
+]
+
+function buildSystemPrompt(modePrompt: string, isModification: boolean): string {
+  return SYSTEM_PROMPT_HEAD + modePrompt + SYSTEM_PROMPT_TAILS[isModification ? 1 : 0]
+}
+
+// 🎯 MODO EDIÇÃO CIRÚRGICA - Para mudanças específicas
+function buildSurgicalEditPrompt(editContext: any): string {
+  const { targetElement, preserveStructure, priority } = editContext
+  const { elementType, originalText, newText, selector } = targetElement
+
+  return `🎯 MODO EDIÇÃO CIRÚRGICA - ${priority?.toUpperCase() || 'BALANCED'} PRIORITY
+
+🚨 CONTEXTO ESPECÍFICO:
+- Elemento alvo: ${elementType || 'text'}
+- Texto original: "${originalText}"
+- Novo texto: "${newText}"
+- Preservar estrutura: ${preserveStructure ? 'SIM' : 'NÃO'}
+- Seletor: ${selector || 'não especificado'}
+
+🔧 INSTRUÇÕES ULTRA-ESPECÍFICAS:
+1. Encontre EXATAMENTE o texto "${originalText}" no HTML
+2. Substitua POR "${newText}"
+3. NÃO altere cores, fontes, espaçamento ou qualquer CSS
+4. NÃO altere estrutura HTML (divs, tables, etc)
+5. NÃO altere outros textos ou conteúdos
+6. Mantenha classes CSS, IDs e atributos idênticos
+
+${priority === 'speed' ? '⚡ MODO RÁPIDO: Mudança cirúrgica apenas no texto especificado' : ''}${priority === 'quality' ? '🎨 MODO QUALIDADE: Garanta que a mudança se integra perfeitamente' : ''}`
+}
+
+type StaticPromptMode = 'create' | 'edit' | 'analyze'
+
+// Prompts estáticos indexados por [sem modificação, com modificação]
+const PREBUILT_SYSTEM_PROMPTS: Record<StaticPromptMode, readonly [string, string]> = {
+  create: [buildSystemPrompt(CREATE_MODE_PROMPT, false), buildSystemPrompt(CREATE_MODE_PROMPT, true)],
+  edit: [buildSystemPrompt(EDIT_MODE_PROMPT, false), buildSystemPrompt(EDIT_MODE_PROMPT, true)],
+  analyze: [buildSystemPrompt(ANALYZE_MODE_PROMPT, false), buildSystemPrompt(ANALYZE_MODE_PROMPT, true)]
+}
+
+const TITLE_TAG_REGEX = /<title>([^<]+)<\/title>/i
+
+// Ordem define a prioridade quando o prompt contém mais de uma categoria
+const SUBJECT_RULES = [
+  { keywords: ['promocional', 'produto', 'oferta'], subject: 'Oferta Especial - Não Perca' },
+  { keywords: ['newsletter', 'novidades'], subject: 'Newsletter - Principais Novidades' },
+  { keywords: ['boas-vindas', 'bem-vindo'], subject: 'Bem-vindo! Que bom ter você conosco' },
+  { keywords: ['fitness', 'exercício'], subject: 'Transforme Seu Corpo - Comece Hoje' }
+] as const
+
+// Todas as palavras em uma única alternação; a palavra encontrada leva direto à
+// regra pela tabela (sem testar os grupos de cada categoria a cada ocorrência)
+const SUBJECT_RULE_BY_KEYWORD: ReadonlyMap<string, number> = new Map(
+  SUBJECT_RULES.flatMap((rule, index) => rule.keywords.map(keyword => [keyword, index] as [string, number]))
+)
+const SUBJECT_KEYWORD_REGEX = new RegExp([...SUBJECT_RULE_BY_KEYWORD.keys()].join('|'), 'gi')
+
+const EXAMPLE_URL_DOMAINS = ['exemplo\\.com', 'example\\.com', 'placeholder\\.com', 'test-site\\.com', 'demo-site\\.com']
+// Uma única alternação cobre todos os domínios de exemplo (uma varredura em vez de uma por domínio)
+const EXAMPLE_IMG_TAG_REGEX = new RegExp(
+  `<img[^>]*src=["']?https?:\\/\\/(?:www\\.)?(?:${EXAMPLE_URL_DOMAINS.join('|')})(?:\\/[^"'\\s]*)?[^"']*["']?[^>]*>`,
+  'gi'
+)
+const PLACEHOLDER_IMAGE_REGEX = /https:\/\/example\.com\/[^"]+\.(?:jpg|png|gif|webp)/gi
+
+const HTML_START_REGEXES: readonly RegExp[] = [
+  /<!DOCTYPE\s+html/i,
+  /<html[^>]*>/i,
+  /<head>/i,
+  /<body[^>]*>/i
+]
+// Fechamento do documento no streaming da resposta (sem /g: usada com test())
+const HTML_CLOSE_TAG_REGEX = /<\/html>/i
+const HTML_END_REGEXES: readonly RegExp[] = [
+  /<\/html>/gi,
+  /<\/body>/gi
+]
+// Frases ancoradas no início: só casam quando há texto antes do primeiro '<'
+const LEADING_PHRASE_REGEXES: readonly RegExp[] = [
+  /^[^<]*(?:HTML|email).*?(?:gerado|modificado|criado).*?(?:sucesso|êxito)[^<]*/gi,
+  /^[^<]*Desculpe.*?HTML.*?[^<]*/gi,
+  /^[^<]*Aqui está.*?[^<]*/gi
+]
+// Frase solta no meio do HTML: exige "sucesso", verificado antes com uma busca simples
+const SUCCESS_PHRASE_REGEX = /[^>]*HTML.*?sucesso.*?[^<]*/gi
+const SUCCESS_WORD_REGEX = /sucesso/i
+
+// "\n" literal, quebra de linha ou retorno de carro - removidos na mesma passada
+const LINE_BREAK_REGEX = /\\n|[\n\r]/g
+const ESCAPED_QUOTE_REGEX = /\\"/g
+const CODE_FENCE_HTML_REGEX = /```html/gi
+const CODE_FENCE_REGEX = /```/g
+const INTER_TAG_WHITESPACE_REGEX = />\s+</g
+// Espaços (inclusive "\n" literal e quebras de linha) entre tags, ou quebra de linha isolada
+const LINE_BREAK_OR_INTER_TAG_WHITESPACE_REGEX = />(?:\s|\\n)+<|\\n|[\n\r]/g
+
+function collapseLineBreakOrInterTagWhitespace(match: string): string {
+  // Só a alternativa entre tags começa com '>'
+  return match.charCodeAt(0) === 62 ? '><' : ''
+}
+// 🚀 OTIMIZAÇÃO: Mesmas faixas (1F600-1F64F, 1F300-1F5FF, 1F680-1F6FF, 1F1E0-1F1FF, 2600-27BF)
+// expressas em unidades UTF-16 - sem a flag u a regex não decodifica code points em todo o HTML
+const EMOJI_REGEX = /[\u2600-\u27BF]|\uD83C[\uDDE0-\uDDFF\uDF00-\uDFFF]|\uD83D[\uDC00-\uDE4F\uDE80-\uDEFF]/g
+
+// Trechos fixos do prompt de criação montados uma única vez; por requisição
+// só entram a instrução, as imagens e o HTML de referência (unidos em um único join)
+const CREATE_PROMPT_HEAD = `🆕 CRIAÇÃO DE EMAIL VIBRANTE E PROFISSIONAL:
+
+INSTRUÇÃO: `
+const CREATE_PROMPT_LAYOUT = `
+
+🎯 ESTRUTURA HTML COM SEÇÕES COLORIDAS:
+<body style="margin:0; padding:0; background: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%);">
+  <div style="max-width:600px; margin:0 auto; padding:24px;">
+    <!-- HEADER COM GRADIENTE -->
+    <div style="background: linear-gradient(135deg, #1e40af 0%, #7c3aed 100%); border-radius:20px 20px 0 0; padding:32px; text-align:center;">
+      <h1 style="color:#ffffff; font-size:36px; font-weight:800; margin:0;">[TÍTULO IMPACTANTE]</h1>
+    </div>
+    
+    <!-- SEÇÕES ALTERNADAS COM CORES -->
+    <div style="background:#ffffff; padding:32px; border-left:1px solid #e5e7eb; border-right:1px solid #e5e7eb;">
+      [CONTEÚDO PRINCIPAL]
+    </div>
+    
+    <div style="background:#f8fafc; padding:32px; border-left:1px solid #e5e7eb; border-right:1px solid #e5e7eb;">
+      [SEÇÃO ALTERNATIVA]
+    </div>
+    
+    <!-- BOTÃO CTA DESTACADO -->
+    <div style="background:#ffffff; padding:32px; text-align:center; border-radius:0 0 20px 20px; border:1px solid #e5e7eb;">
+      <a href="#" style="background: linear-gradient(135deg, #1e40af 0%, #7c3aed 100%); color:#ffffff; padding:20px 40px; border-radius:16px; text-decoration:none; font-weight:700; font-size:18px; box-shadow:0 8px 25px rgba(30,64,175,0.3); display:inline-block; transition:transform 0.2s;">
+        [CALL TO ACTION]
+      </a>
+    </div>
+  </div>
+</body>
+
+🎨 SISTEMA DE CORES VIBRANTES OBRIGATÓRIO:
+- Gradiente de fundo: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%)
+- Header: gradiente azul-roxo (linear-gradient(135deg, #1e40af 0%, #7c3aed 100%))
+- Seções alternadas: #ffffff (branco) e #f8fafc (azul muito claro)
+- Botões: mesmo gradiente do header com sombra colorida
+- Texto primário: #1f2937 (escuro forte)
+- Texto secundário: #6b7280 (cinza médio)
+- Destaques: #fbbf24 (amarelo), #059669 (verde), #dc2626 (vermelho)
+
+🚀 ELEMENTOS VISUAIS OBRIGATÓRIOS:
+- Bordas arredondadas: 20px nos containers principais, 16px nos botões
+- Sombras coloridas: box-shadow com a cor do gradiente (rgba)
+- Espaçamento generoso: padding 32px nas seções
+- Ícones ou emojis estratégicos para cada seção
+- Hierarquia visual clara com tamanhos de fonte diferenciados
+- Transições suaves nos botões (hover effects)
+
+`
+const CREATE_PROMPT_IMAGES_OPEN = `
+🖼️ TRATAMENTO DE IMAGENS CRÍTICO:
+IMAGENS FORNECIDAS: `
+const CREATE_PROMPT_IMAGE_TAGS_OPEN = `
+
+INSTRUÇÕES PARA INSERÇÃO DE IMAGENS:
+- SEMPRE usar as URLs EXATAS fornecidas: `
+const CREATE_PROMPT_IMAGE_RULES = `
+- Aplicar estilos: max-width:100%; height:auto; border-radius:16px; box-shadow:0 8px 25px rgba(0,0,0,0.15);
+- Posicionar em seções dedicadas com backgrounds contrastantes
+- Adicionar moldura visual com padding:24px e background diferenciado
+- Alt text descritivo e contextual para cada imagem
+- Margin:24px 0 para espaçamento adequado entre imagens e texto
+`
+const CREATE_PROMPT_NO_IMAGES = '🎨 SEM IMAGENS: Compense com design rico em cores, gradientes e elementos visuais impactantes'
+const CREATE_PROMPT_RESULT = `
+
+✅ RESULTADO ESPERADO:
+Email que é uma EXPERIÊNCIA VISUAL rica e vibrante, com seções coloridas bem delimitadas, hierarquia clara e personalidade forte da marca`
+const CREATE_PROMPT_REFERENCE_OPEN = `
+
+HTML DE REFERÊNCIA (inspire-se na estrutura):
+`
+
+/**
+ * Dados derivados das intenções de imagem, usados pelos logs e pela substituição de placeholders
+ */
+interface ImageIntentSummary {
+  intents?: Array<'analyze' | 'include'>
+  includeUrls: string[]
+  analyzeCount: number
+}
+
+/**
+ * Uma única passada pelas intenções, em vez de um map() e três filter()
+ * espalhados entre os logs e o processamento de imagens
+ */
+function summarizeImageIntents(imageIntents?: IARequest['imageIntents']): ImageIntentSummary {
+  const includeUrls: string[] = []
+  let analyzeCount = 0
+  
+  if (!imageIntents) {
+    return { includeUrls, analyzeCount }
+  }
+  
+  const intents = new Array<'analyze' | 'include'>(imageIntents.length)
+  for (let i = 0; i < imageIntents.length; i++) {
+    const { url, intent } = imageIntents[i]
+    intents[i] = intent
+    if (intent === 'include') {
+      includeUrls.push(url)
+    } else if (intent === 'analyze') {
+      analyzeCount++
+    }
+  }
+  
+  return { intents, includeUrls, analyzeCount }
+}
+
+/**
+ * Tags <img> das URLs fornecidas, separadas por espaço
+ */
+function renderImageTags(urls: readonly string[]): string {
+  let tags = ''
+  for (let i = 0; i < urls.length; i++) {
+    tags += (i > 0 ? ' <img src="' : '<img src="') + urls[i] + '" />'
+  }
+  return tags
+}
+
+/**
+ * Substitui as N primeiras URLs de exemplo pelas imagens do usuário, na ordem em que aparecem.
+ * Uma única varredura que para assim que todas as imagens foram posicionadas,
+ * em vez de materializar todas as ocorrências com match() a cada imagem
+ */
+function replacePlaceholderImages(html: string, urls: readonly string[]): string {
+  const parts: string[] = []
+  let position = 0
+  let index = 0
+  let match: RegExpExecArray | null
+  
+  PLACEHOLDER_IMAGE_REGEX.lastIndex = 0
+  while (index < urls.length && (match = PLACEHOLDER_IMAGE_REGEX.exec(html)) !== null) {
+    parts.push(html.substring(position, match.index), urls[index++])
+    position = match.index + match[0].length
+  }
+  
+  if (index === 0) {
+    return html
+  }
+  
+  parts.push(html.substring(position))
+  return parts.join('')
+}
+
+// Por quanto tempo o resultado do health check da API é reaproveitado
+const HEALTH_CHECK_CACHE_TTL = 30 * 1000
+// Respostas do modelo para edições idênticas (reenvios, cliques duplos, retries do frontend).
+// Só entram no cache chamadas determinísticas: edições com temperatura até
+// COMPLETION_CACHE_MAX_TEMPERATURE - criações (0.7) continuam gerando um email novo a cada pedido
+const COMPLETION_CACHE_TTL = 5 * 60 * 1000
+const COMPLETION_CACHE_MAX_ENTRIES = 1024
+const COMPLETION_CACHE_MAX_TEMPERATURE = 0.2
+
+/**
+ * Lê inteiro o corpo de uma resposta de erro recebida como stream, devolvendo o JSON da
+ * OpenRouter (ou o texto, se não for JSON). Consumir o corpo também libera o socket.
+ */
+async function readErrorStreamBody(stream: NodeJS.ReadableStream): Promise<any> {
+  let text = ''
+  try {
+    stream.setEncoding('utf8')
+    for await (const chunk of stream) {
+      text += chunk
+    }
+  } catch (readError) {
+    // Corpo incompleto: fica o que foi lido até aqui
+  }
+  
+  try {
+    return JSON.parse(text)
+  } catch (parseError) {
+    return text
+  }
+}
+
+/**
+ * Interpreta uma linha do stream SSE: devolve o delta de conteúdo ('' quando a linha não traz
+ * conteúdo) ou null no [DONE]. Evento de erro da OpenRouter vira exceção.
+ */
+function parseSSELine(line: string): string | null {
+  // Linhas de comentário (": OPENROUTER PROCESSING") e separadores são ignoradas
+  if (!line.startsWith('data:')) return ''
+  
+  const data = line.substring(5).trim()
+  if (data === '[DONE]') return null
+  
+  // Linha malformada é descartada em vez de derrubar a geração inteira - mas o delta perdido
+  // pode deixar o HTML incompleto, então o descarte fica registrado
+  let event: any
+  try {
+    event = JSON.parse(data)
+  } catch (parseError) {
+    logger.warn('⚠️ [IA-SERVICE] Linha SSE inválida descartada', {
+      length: data.length,
+      preview: data.substring(0, 200)
+    })
+    return ''
+  }
+  
+  if (event.error) {
+    throw new Error(`Erro da API OpenRouter durante o streaming: ${event.error.message || 'desconhecido'}`)
+  }
+  
+  return event.choices?.[0]?.delta?.content || ''
+}
+
+class IAService {
+  private client: AxiosInstance
+  private apiKey: string
+  private model: string
+  private baseUrl: string
+  private maxConcurrent: number = 50
+  // Último resultado do health check (ou a verificação em andamento) e quando foi iniciado
+  private healthCheckResult: Promise<boolean> | null = null
+  private healthCheckStartedAt = 0
+  // Respostas em cache (capacidade fixa, cada entrada guarda um documento HTML inteiro) e
+  // chamadas ao LLM em andamento, ambas por chave do payload
+  private completionCache = new Map<string, { content: string; expiresAt: number }>()
+  private inflightCompletions = new Map<string, Promise<string>>()
+
+  constructor() {
+    this.apiKey = process.env.OPENROUTER_API_KEY || ''
+    this.model = process.env.OPENROUTER_MODEL || 'anthropic/claude-3.5-sonnet'
+    this.baseUrl = process.env.OPENROUTER_BASE_URL || 'https://openrouter.ai/api/v1'
+    
+    if (!this.apiKey) {
+      logger.warn('OPENROUTER_API_KEY não configurada - serviço IA desabilitado')
+    }
+
+    this.client = axios.create({
+      baseURL: this.baseUrl,
+      timeout: 90000,
+      httpAgent: keepAliveHttpAgent,
+      httpsAgent: keepAliveHttpsAgent,
+      headers: {
+        'Authorization': `Bearer ${this.apiKey}`,
+        'Content-Type': 'application/json',
+        'HTTP-Referer': process.env.APP_URL || 'http://localhost:3000',
+        'X-Title': 'MailTrendz'
+      }
+    })
+
+    this.setupInterceptors()
+  }
+
+  private setupInterceptors(): void {
+    this.client.interceptors.request.use(
+      (config) => {
+        logger.info(`IA REQUEST: ${config.method?.toUpperCase()} ${config.url}`)
+        return config
+      },
+      (error) => {
+        logger.error('IA Request error:', error.message)
+        return Promise.reject(error)
+      }
+    )
+
+    this.client.interceptors.response.use(
+      (response) => {
+        logger.info(`IA RESPONSE: ${response.config.method?.toUpperCase()} ${response.config.url} - SUCCESS`)
+        return response
+      },
+      (error) => {
+        logger.error('IA Response error:', error.message)
+        return Promise.reject(error)
+      }
+    )
+  }
+
+  private getSystemPrompt(
+    hasExistingHTML: boolean,
+    isModification: boolean = false,
+    operation?: 'create' | 'edit' | 'analyze',
+    editContext?: any
+  ): string {
+    // 🎯 MODO EDIÇÃO CIRÚRGICA - Único prompt que depende do contexto da requisição
+    if (operation === 'edit' && editContext?.targetElement) {
+      return buildSystemPrompt(buildSurgicalEditPrompt(editContext), isModification)
+    }
+
+    // Demais modos usam prompts pré-montados no carregamento do módulo
+    let mode: StaticPromptMode = 'create'
+    if (operation === 'edit' && hasExistingHTML) {
+      mode = 'edit'
+    } else if (operation === 'analyze' && hasExistingHTML) {
+      mode = 'analyze'
+    }
+
+    return PREBUILT_SYSTEM_PROMPTS[mode][isModification ? 1 : 0]
   }
 
   private buildMessageContent(
@@ -236,16 +594,19 @@ ${getOptimizedPrompt()}
     // ✨ PROMPTS ULTRA-ESPECÍFICOS POR OPERAÇÃO
     let prompt = ''
     
+    const hasImages = !!imageUrls && imageUrls.length > 0
+    const imageList = hasImages ? imageUrls!.join(', ') : ''
+    
     if (operation === 'edit' && editContext?.targetElement) {
       // 🎯 PROMPT CIRÚRGICO PARA EDIÇÕES ESPECÍFICAS
-      const { targetElement } = editContext
+      const { originalText, newText } = editContext.targetElement
       prompt = `🎯 EDIÇÃO CIRÚRGICA ESPECÍFICA:
 
-TAREFA: Substitua EXATAMENTE "${targetElement.originalText}" por "${targetElement.newText}"
+TAREFA: Substitua EXATAMENTE "${originalText}" por "${newText}"
 
 REGRAS CRÍTICAS:
-- Encontre o texto "${targetElement.originalText}" no HTML abaixo
-- Substitua por "${targetElement.newText}"  
+- Encontre o texto "${originalText}" no HTML abaixo
+- Substitua por "${newText}"  
 - NÃO altere mais NADA (cores, fontes, estrutura)
 - Retorne o HTML completo com apenas essa mudança
 
@@ -297,78 +658,27 @@ ${existingHTML}`
       
     } else {
       // 🆕 PROMPT PARA CRIAÇÃO NOVA
-      prompt = `🆕 CRIAÇÃO DE EMAIL VIBRANTE E PROFISSIONAL:
-
-INSTRUÇÃO: ${userInput}
-
-🎯 ESTRUTURA HTML COM SEÇÕES COLORIDAS:
-<body style="margin:0; padding:0; background: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%);">
-  <div style="max-width:600px; margin:0 auto; padding:24px;">
-    <!-- HEADER COM GRADIENTE -->
-    <div style="background: linear-gradient(135deg, #1e40af 0%, #7c3aed 100%); border-radius:20px 20px 0 0; padding:32px; text-align:center;">
-      <h1 style="color:#ffffff; font-size:36px; font-weight:800; margin:0;">[TÍTULO IMPACTANTE]</h1>
-    </div>
-    
-    <!-- SEÇÕES ALTERNADAS COM CORES -->
-    <div style="background:#ffffff; padding:32px; border-left:1px solid #e5e7eb; border-right:1px solid #e5e7eb;">
-      [CONTEÚDO PRINCIPAL]
-    </div>
-    
-    <div style="background:#f8fafc; padding:32px; border-left:1px solid #e5e7eb; border-right:1px solid #e5e7eb;">
-      [SEÇÃO ALTERNATIVA]
-    </div>
-    
-    <!-- BOTÃO CTA DESTACADO -->
-    <div style="background:#ffffff; padding:32px; text-align:center; border-radius:0 0 20px 20px; border:1px solid #e5e7eb;">
-      <a href="#" style="background: linear-gradient(135deg, #1e40af 0%, #7c3aed 100%); color:#ffffff; padding:20px 40px; border-radius:16px; text-decoration:none; font-weight:700; font-size:18px; box-shadow:0 8px 25px rgba(30,64,175,0.3); display:inline-block; transition:transform 0.2s;">
-        [CALL TO ACTION]
-      </a>
-    </div>
-  </div>
-</body>
-
-🎨 SISTEMA DE CORES VIBRANTES OBRIGATÓRIO:
-- Gradiente de fundo: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%)
-- Header: gradiente azul-roxo (linear-gradient(135deg, #1e40af 0%, #7c3aed 100%))
-- Seções alternadas: #ffffff (branco) e #f8fafc (azul muito claro)
-- Botões: mesmo gradiente do header com sombra colorida
-- Texto primário: #1f2937 (escuro forte)
-- Texto secundário: #6b7280 (cinza médio)
-- Destaques: #fbbf24 (amarelo), #059669 (verde), #dc2626 (vermelho)
-
-🚀 ELEMENTOS VISUAIS OBRIGATÓRIOS:
-- Bordas arredondadas: 20px nos containers principais, 16px nos botões
-- Sombras coloridas: box-shadow com a cor do gradiente (rgba)
-- Espaçamento generoso: padding 32px nas seções
-- Ícones ou emojis estratégicos para cada seção
-- Hierarquia visual clara com tamanhos de fonte diferenciados
-- Transições suaves nos botões (hover effects)
-
-${imageUrls && imageUrls.length > 0 ? `
-🖼️ TRATAMENTO DE IMAGENS CRÍTICO:
-IMAGENS FORNECIDAS: ${imageUrls.join(', ')}
-
-INSTRUÇÕES PARA INSERÇÃO DE IMAGENS:
-- SEMPRE usar as URLs EXATAS fornecidas: ${imageUrls.map(url => `<img src="${url}" />`).join(' ')}
-- Aplicar estilos: max-width:100%; height:auto; border-radius:16px; box-shadow:0 8px 25px rgba(0,0,0,0.15);
-- Posicionar em seções dedicadas com backgrounds contrastantes
-- Adicionar moldura visual com padding:24px e background diferenciado
-- Alt text descritivo e contextual para cada imagem
-- Margin:24px 0 para espaçamento adequado entre imagens e texto
-` : '🎨 SEM IMAGENS: Compense com design rico em cores, gradientes e elementos visuais impactantes'}
-
-✅ RESULTADO ESPERADO:
-Email que é uma EXPERIÊNCIA VISUAL rica e vibrante, com seções coloridas bem delimitadas, hierarquia clara e personalidade forte da marca${existingHTML ? `
-
-HTML DE REFERÊNCIA (inspire-se na estrutura):
-${existingHTML}` : ''}`
+      const parts = [CREATE_PROMPT_HEAD, userInput, CREATE_PROMPT_LAYOUT]
+      
+      if (hasImages) {
+        parts.push(CREATE_PROMPT_IMAGES_OPEN, imageList, CREATE_PROMPT_IMAGE_TAGS_OPEN, renderImageTags(imageUrls!), CREATE_PROMPT_IMAGE_RULES)
+      } else {
+        parts.push(CREATE_PROMPT_NO_IMAGES)
+      }
+      
+      parts.push(CREATE_PROMPT_RESULT)
+      if (existingHTML) {
+        parts.push(CREATE_PROMPT_REFERENCE_OPEN, existingHTML)
+      }
+      
+      prompt = parts.join('')
     }
 
     // 🔥 ADICIONAR IMAGENS SE FORNECIDAS
-    if (imageUrls && imageUrls.length > 0) {
+    if (hasImages) {
       prompt += `
 
-IMAGENS: ${imageUrls.join(', ')}`
+IMAGENS: ${imageList}`
     }
 
     // 🔥 RETORNAR CONTENT ESTRUTURADO
@@ -376,57 +686,163 @@ IMAGENS: ${imageUrls.join(', ')}`
       return prompt
     }
 
-    const content: any[] = [
-      {
-        type: 'text',
-        text: prompt
-      }
-    ]
+    const content: any[] = new Array(imageUrls.length + 1)
+    content[0] = {
+      type: 'text',
+      text: prompt
+    }
 
-    imageUrls.forEach((url) => {
-      content.push({
+    for (let i = 0; i < imageUrls.length; i++) {
+      content[i + 1] = {
         type: 'image_url',
         image_url: {
-          url: url
+          url: imageUrls[i]
         }
-      })
-    })
+      }
+    }
 
     return content
   }
 
-  // 🔥 FUNÇÃO CORRIGIDA: Remover apenas URLs de exemplo específicas, preservar imagens reais
-  private removeExampleUrls(html: string): string {
-    // Padrões muito específicos de URLs de exemplo para evitar remoção acidental
-    const specificExamplePatterns = [
-      /https?:\/\/(?:www\.)?exemplo\.com(?:\/[^"'\s]*)?/gi,
-      /https?:\/\/(?:www\.)?example\.com(?:\/[^"'\s]*)?/gi,
-      /https?:\/\/(?:www\.)?placeholder\.com(?:\/[^"'\s]*)?/gi,
-      /https?:\/\/(?:www\.)?test-site\.com(?:\/[^"'\s]*)?/gi,
-      /https?:\/\/(?:www\.)?demo-site\.com(?:\/[^"'\s]*)?/gi
-    ]
+  /**
+   * Envia a requisição ao modelo e devolve o conteúdo bruto da resposta.
+   * Com `cacheable`, requisições idênticas (mesmo modelo, prompts, imagens e temperatura) dentro
+   * de COMPLETION_CACHE_TTL reaproveitam a resposta anterior em vez de repetir a chamada ao LLM,
+   * e quem chega enquanto a mesma requisição está em andamento aguarda essa chamada em vez de
+   * abrir outra. Sem `cacheable` (gerações não determinísticas) sempre há uma chamada nova -
+   * "gerar de novo" precisa produzir outro resultado. O crédito da requisição é cobrado mesmo
+   * num acerto do cache: a cobrança é por pedido do usuário, não por chamada ao modelo
+   */
+  private async requestCompletion(payload: Record<string, any>, cacheable: boolean): Promise<string> {
+    // 🚀 OTIMIZAÇÃO: O payload (que carrega o HTML atual inteiro) é serializado uma única vez -
+    // o mesmo JSON serve de chave do cache e de corpo da requisição, sem o axios serializar de novo
+    const body = JSON.stringify({ ...payload, stream: true })
+    if (!cacheable) {
+      return this.fetchCompletion(body)
+    }
     
-    let cleanedHtml = html
+    const cacheKey = createHash('sha256').update(body).digest('hex')
+    const cached = this.completionCache.get(cacheKey)
+    if (cached) {
+      if (Date.now() <= cached.expiresAt) {
+        logger.info('⚡ [IA-SERVICE] Resposta reaproveitada do cache (requisição idêntica)')
+        return cached.content
+      }
+      this.completionCache.delete(cacheKey)
+    }
+
+    const inflight = this.inflightCompletions.get(cacheKey)
+    if (inflight) {
+      logger.info('⚡ [IA-SERVICE] Aguardando chamada idêntica já em andamento')
+      return inflight
+    }
+
+    const completion = this.fetchCompletion(body)
+    this.inflightCompletions.set(cacheKey, completion)
+    try {
+      const content = await completion
+      this.cacheCompletion(cacheKey, content)
+      return content
+    } finally {
+      this.inflightCompletions.delete(cacheKey)
+    }
+  }
+
+  private async fetchCompletion(body: string): Promise<string> {
+    const content = await this.streamCompletion(body)
+    if (!content) {
+      throw new Error('Resposta inválida da API OpenRouter')
+    }
+    return content
+  }
+
+  // Cache com capacidade fixa: o Map mantém a ordem de inserção, então a entrada mais antiga
+  // é a primeira chave e sai em O(1) quando o limite é atingido
+  private cacheCompletion(cacheKey: string, content: string): void {
+    if (this.completionCache.size >= COMPLETION_CACHE_MAX_ENTRIES && !this.completionCache.has(cacheKey)) {
+      const oldestKey = this.completionCache.keys().next().value
+      if (oldestKey !== undefined) {
+        this.completionCache.delete(oldestKey)
+      }
+    }
+    this.completionCache.set(cacheKey, { content, expiresAt: Date.now() + COMPLETION_CACHE_TTL })
+  }
+
+  /**
+   * Recebe a resposta do modelo em streaming (SSE) acumulando os deltas de conteúdo.
+   * 🚀 OTIMIZAÇÃO: Assim que o fechamento </html> chega, a leitura é encerrada e a conexão
+   * abortada - o texto que o modelo ainda escreveria depois do documento seria descartado
+   * por extractOnlyHTML, então não há por que esperar (nem pagar) por ele. O custo: o socket
+   * abortado é descartado em vez de voltar ao pool do keep-alive. No fim normal ([DONE]) o
+   * stream é lido até o fim, e a conexão é reaproveitada
+   */
+  private async streamCompletion(body: string): Promise<string> {
+    // Corpo já serializado (com stream: true) - enviado como está, com o Content-Type JSON do cliente
+    // (o transformRequest padrão do axios faria um JSON.parse de validação em strings com esse Content-Type)
+    let response
+    try {
+      response = await this.client.post('/chat/completions', body, {
+        responseType: 'stream',
+        transformRequest: [(data: string) => data]
+      })
+    } catch (error: any) {
+      // Com responseType 'stream', respostas de erro (401, 429, 5xx) também chegam como stream:
+      // o corpo é lido antes de propagar o erro - o log mostra a mensagem da OpenRouter em vez
+      // do objeto do socket, e o socket não fica preso a um corpo nunca lido
+      const errorStream = error.response?.data
+      if (errorStream && typeof errorStream.pipe === 'function') {
+        error.response.data = await readErrorStreamBody(errorStream)
+      }
+      throw error
+    }
     
-    // Remover apenas tags img com URLs claramente de exemplo
-    specificExamplePatterns.forEach(pattern => {
-      // Remover tags img que contenham esses domínios específicos
-      cleanedHtml = cleanedHtml.replace(new RegExp(`<img[^>]*src=["']?${pattern.source}[^"']*["']?[^>]*>`, 'gi'), '')
-    })
+    const stream = response.data
+    // Decodificação UTF-8 feita pelo stream: caracteres multibyte divididos entre chunks chegam inteiros
+    stream.setEncoding('utf8')
     
-    // Log para debug
-    const imgTags = html.match(/<img[^>]*>/gi)
-    if (imgTags) {
-      logger.debug('🖼️ [IA-SERVICE] Imagens encontradas no HTML:', {
-        count: imgTags.length,
-        images: imgTags.map(img => {
-          const srcMatch = img.match(/src=["']?([^"'\s>]+)["']?/)
-          return srcMatch ? srcMatch[1] : 'src não encontrado'
-        })
-      })
+    let content = ''
+    let pending = ''
+    let done = false
+    
+    for await (const chunk of stream) {
+      // Depois do [DONE] o restante só é drenado até o fim, para o socket voltar ao pool
+      if (done) continue
+      
+      pending += chunk
+      const deltaStart = content.length
+      
+      let lineEnd: number
+      while ((lineEnd = pending.indexOf('\n')) !== -1) {
+        const delta = parseSSELine(pending.substring(0, lineEnd).trim())
+        pending = pending.substring(lineEnd + 1)
+        if (delta === null) {
+          done = true
+          break
+        }
+        content += delta
+      }
+      
+      // Procura o fechamento só no trecho novo (mais 6 caracteres para um "</html>" dividido entre deltas)
+      if (!done && HTML_CLOSE_TAG_REGEX.test(content.substring(Math.max(0, deltaStart - 6)))) {
+        // Sair do for await destrói o stream e aborta a requisição (o socket não volta ao pool)
+        return content
+      }
     }
     
-    return cleanedHtml
+    // Stream encerrado sem [DONE]: a última linha pode ter chegado sem o '\n' final
+    if (!done && pending.trim()) {
+      content += parseSSELine(pending.trim()) || ''
+    }
+    
+    return content
+  }
+
+  // 🔥 FUNÇÃO CORRIGIDA: Remover apenas URLs de exemplo específicas, preservar imagens reais
+  private removeExampleUrls(html: string): string {
+    // Remover apenas tags img com URLs claramente de exemplo
+    // Todos os domínios em uma única passada sobre o HTML
+    // (a lista de imagens para debug é extraída do DOM em processHTMLWithCheerio)
+    return html.replace(EXAMPLE_IMG_TAG_REGEX, '')
   }
 
   // 🔥 FUNÇÃO DEFINITIVA: Extrair APENAS HTML da resposta da IA
@@ -434,30 +850,17 @@ IMAGENS: ${imageUrls.join(', ')}`
     let html = response.trim()
     
     // 1. Remover qualquer texto antes do HTML
-    const htmlStartPatterns = [
-      /<!DOCTYPE\s+html/i,
-      /<html[^>]*>/i,
-      /<head>/i,
-      /<body[^>]*>/i
-    ]
-    
-    for (const pattern of htmlStartPatterns) {
-      const match = html.match(pattern)
+    for (const pattern of HTML_START_REGEXES) {
+      const match = pattern.exec(html)
       if (match) {
-        const startIndex = html.indexOf(match[0])
-        html = html.substring(startIndex)
+        html = html.substring(match.index)
         break
       }
     }
     
     // 2. Remover qualquer texto depois do HTML
-    const htmlEndPatterns = [
-      /<\/html>/i,
-      /<\/body>/i
-    ]
-    
-    for (const pattern of htmlEndPatterns) {
-      const matches = [...html.matchAll(new RegExp(pattern.source, 'gi'))]
+    for (const pattern of HTML_END_REGEXES) {
+      const matches = [...html.matchAll(pattern)]
       if (matches.length > 0) {
         const lastMatch = matches[matches.length - 1]
         const endIndex = lastMatch.index! + lastMatch[0].length
@@ -467,16 +870,16 @@ IMAGENS: ${imageUrls.join(', ')}`
     }
     
     // 3. Remover frases de resposta que a IA pode adicionar
-    const unwantedPhrases = [
-      /^[^<]*(?:HTML|email).*?(?:gerado|modificado|criado).*?(?:sucesso|êxito)[^<]*/gi,
-      /^[^<]*Desculpe.*?HTML.*?[^<]*/gi,
-      /^[^<]*Aqui está.*?[^<]*/gi,
-      /[^>]*HTML.*?sucesso.*?[^<]*/gi
-    ]
-    
-    unwantedPhrases.forEach(pattern => {
-      html = html.replace(pattern, '')
-    })
+    // 🚀 OTIMIZAÇÃO: Passadas que não têm como casar são puladas - a resposta já recortada
+    // normalmente começa em '<' e não contém "sucesso" (a última regex é cara: testa cada posição)
+    if (html.charCodeAt(0) !== 60) {
+      LEADING_PHRASE_REGEXES.forEach(pattern => {
+        html = html.replace(pattern, '')
+      })
+    }
+    if (SUCCESS_WORD_REGEX.test(html)) {
+      html = html.replace(SUCCESS_PHRASE_REGEX, '')
+    }
     
     // 4. Garantir que começa com tag HTML válida
     html = html.trim()
@@ -491,7 +894,7 @@ IMAGENS: ${imageUrls.join(', ')}`
   }
 
   public async generateHTML(request: IARequest): Promise<IAResponse> {
-    const startTime = Date.now()
+    const startTime = performance.now()
     
     try {
       if (!this.apiKey) {
@@ -513,10 +916,13 @@ IMAGENS: ${imageUrls.join(', ')}`
         request.operation = 'edit'
       }
 
+      const imageSummary = summarizeImageIntents(request.imageIntents)
+      const temperature = request.operation === 'edit' ? 0.1 : 0.7
+
       logger.info('🎯 [IA-SERVICE] SOLUÇÃO DEFINITIVA - Processando com contexto robusto', {
         hasImages: !!(request.imageUrls && request.imageUrls.length > 0),
         imageCount: request.imageUrls?.length || 0,
-        imageIntents: request.imageIntents?.map(i => i.intent),
+        imageIntents: imageSummary.intents,
         model: this.model,
         hasExistingHTML,
         existingHTMLLength: existingHTML?.length || 0,
@@ -541,7 +947,7 @@ IMAGENS: ${imageUrls.join(', ')}`
         request.editContext
       )
       
-      const response = await this.client.post('/chat/completions', {
+      const content = await this.requestCompletion({
         model: this.model,
         messages: [
           {
@@ -555,14 +961,10 @@ IMAGENS: ${imageUrls.join(', ')}`
         ],
         max_tokens: 4096,
         // ✨ TEMPERATURA ULTRA-OTIMIZADA POR OPERAÇÃO
-        temperature: request.operation === 'edit' ? 0.1 : 0.7 // Mínima criatividade para edições para máxima precisão
-      })
+        temperature // Mínima criatividade para edições para máxima precisão
+      }, request.operation === 'edit' && temperature <= COMPLETION_CACHE_MAX_TEMPERATURE)
 
-      if (!response.data?.choices?.[0]?.message?.content) {
-        throw new Error('Resposta inválida da API OpenRouter')
-      }
-
-      let html = response.data.choices[0].message.content.trim()
+      let html = content.trim()
       
       // 🔥 LIMPEZA AGRESSIVA - SÓ HTML
       html = this.extractOnlyHTML(html)
@@ -570,41 +972,19 @@ IMAGENS: ${imageUrls.join(', ')}`
       html = this.removeEmojis(html)
       
       // 🔥 PROCESSAR IMAGENS
-      const includeImages = request.imageIntents?.filter(i => i.intent === 'include') || []
-      if (includeImages.length > 0) {
-        includeImages.forEach((img, index) => {
-          const placeholderPattern = new RegExp(`https://example\\.com/[^"]+\\.(?:jpg|png|gif|webp)`, 'gi')
-          const matches = html.match(placeholderPattern)
-          if (matches && matches[index]) {
-            html = html.replace(matches[index], img.url)
-          }
-        })
+      if (imageSummary.includeUrls.length > 0) {
+        html = replacePlaceholderImages(html, imageSummary.includeUrls)
       } else if (!request.imageIntents && request.imageUrls && request.imageUrls.length > 0) {
-        request.imageUrls.forEach((url, index) => {
-          const placeholderPattern = new RegExp(`https://example\\.com/[^"]+\\.(?:jpg|png|gif|webp)`, 'gi')
-          const matches = html.match(placeholderPattern)
-          if (matches && matches[index]) {
-            html = html.replace(matches[index], url)
-          }
-        })
+        html = replacePlaceholderImages(html, request.imageUrls)
       }
       
       // 🔥 REMOVER URLs DE EXEMPLO NÃO SUBSTITUÍDAS
       html = this.removeExampleUrls(html)
       
-      // 🔥 PROCESSAR COM CHEERIO
+      // 🔥 PROCESSAR COM CHEERIO (CSS moderno + CSS inline no mesmo documento)
       html = this.processHTMLWithCheerio(html)
       
-      // 🔥 APLICAR CSS INLINE
-      try {
-        logger.info('Aplicando CSS inline...')
-        html = inlineStyles(html)
-        logger.info('CSS inline aplicado com sucesso')
-      } catch (inlineError) {
-        logger.error('Erro ao aplicar CSS inline:', inlineError)
-      }
-      
-      const processingTime = Date.now() - startTime
+      const processingTime = Math.round(performance.now() - startTime)
       
       // 🚀 LOG DEFINITIVO DE SUCESSO COM VALIDAÇÃO DE CONTEXTO
       logger.info('🎯 [IA-SERVICE] SOLUÇÃO DEFINITIVA CONCLUÍDA', {
@@ -621,11 +1001,11 @@ IMAGENS: ${imageUrls.join(', ')}`
         contextPreserved: hasExistingHTML && request.operation === 'edit',
         // INFORMAÇÕES TÉCNICAS
         imagesProcessed: request.imageUrls?.length || 0,
-        imagesAnalyzed: request.imageIntents?.filter(i => i.intent === 'analyze').length || 0,
-        imagesIncluded: request.imageIntents?.filter(i => i.intent === 'include').length || 0,
+        imagesAnalyzed: imageSummary.analyzeCount,
+        imagesIncluded: imageSummary.includeUrls.length,
         model: this.model,
         htmlContainsImages: html.includes('<img'),
-        temperature: request.operation === 'edit' ? 0.1 : 0.7,
+        temperature,
         // VALIDAÇÃO FINAL
         problemSolved: hasExistingHTML ? 
           (request.operation === 'edit' ? 'CONTEXTO-PRESERVADO' : 'POSSÍVEL-PROBLEMA') :
@@ -659,59 +1039,84 @@ IMAGENS: ${imageUrls.join(', ')}`
   }
 
   private cleanHTML(html: string): string {
-    html = html.replace(/\\n/g, '').replace(/\n/g, '').replace(/\r/g, '')
-    html = html.replace(/\\"/g, '"')
-    html = html.replace(/```html/gi, '').replace(/```/g, '')
-    html = html.replace(/>\s+</g, '><').trim()
+    // Sem crases não há blocos de código a remover, então quebras de linha e
+    // espaços entre tags saem na mesma passada (resultado idêntico ao das passadas separadas)
+    if (!html.includes('`')) {
+      html = html.replace(LINE_BREAK_OR_INTER_TAG_WHITESPACE_REGEX, collapseLineBreakOrInterTagWhitespace)
+      if (html.includes('\\"')) {
+        html = html.replace(ESCAPED_QUOTE_REGEX, '"')
+      }
+      return html.trim()
+    }
+    
+    html = html.replace(LINE_BREAK_REGEX, '')
+    
+    // Busca literal com includes antes de acionar as regex - na maioria das
+    // respostas não há aspas escapadas nem blocos de código e o HTML não é reescrito
+    if (html.includes('\\"')) {
+      html = html.replace(ESCAPED_QUOTE_REGEX, '"')
+    }
+    if (html.includes('```')) {
+      html = html.replace(CODE_FENCE_HTML_REGEX, '').replace(CODE_FENCE_REGEX, '')
+    }
+    html = html.replace(INTER_TAG_WHITESPACE_REGEX, '><').trim()
     
     return html
   }
 
   private removeEmojis(html: string): string {
-    const emojiRegex = /[\u{1F600}-\u{1F64F}]|[\u{1F300}-\u{1F5FF}]|[\u{1F680}-\u{1F6FF}]|[\u{1F1E0}-\u{1F1FF}]|[\u{2600}-\u{26FF}]|[\u{2700}-\u{27BF}]/gu
-    
-    return html.replace(emojiRegex, '').trim()
+    return html.replace(EMOJI_REGEX, '').trim()
   }
 
   private processHTMLWithCheerio(html: string): string {
     try {
       const $ = cheerio.load(html)
       
-      let styleTag = $('style').html() || ''
+      // Log para debug
+      // Imagens lidas da árvore que já foi montada, em vez de regex sobre o HTML;
+      // só monta a lista quando o nível debug está ativo
+      if (logger.isDebugEnabled()) {
+        const images = $('img')
+        if (images.length > 0) {
+          logger.debug('🖼️ [IA-SERVICE] Imagens encontradas no HTML:', {
+            count: images.length,
+            images: images.map((_, img) => $(img).attr('src') || 'src não encontrado').get()
+          })
+        }
+      }
       
-      // Aplicar CSS moderno se não existir
-      if (!styleTag.includes('border-radius') && !styleTag.includes('.email-container')) {
-        const modernCSS = `
-          body { margin: 0; padding: 0; background-color: #f3f4f6; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; }
-          .email-container { max-width: 600px; margin: 0 auto; background-color: #f3f4f6; padding: 20px; }
-          .email-card { background: #ffffff; border-radius: 16px; padding: 40px; margin: 20px 0; box-shadow: 0 10px 40px rgba(0,0,0,0.12); border: 1px solid #e5e7eb; }
-          .email-header { text-align: center; margin-bottom: 32px; }
-          .email-title { font-size: 32px; font-weight: 800; color: #111827; margin-bottom: 12px; line-height: 1.2; }
-          .email-subtitle { font-size: 18px; color: #6b7280; margin-bottom: 32px; line-height: 1.5; }
-          .email-content { font-size: 16px; line-height: 1.7; color: #374151; margin-bottom: 24px; }
-          .email-button { display: inline-block; background: linear-gradient(135deg, #3b82f6 0%, #1d4ed8 100%); color: #ffffff !important; padding: 16px 40px; border-radius: 12px; text-decoration: none; font-weight: 700; font-size: 16px; margin: 24px 0; text-align: center; box-shadow: 0 4px 16px rgba(59,130,246,0.3); transition: transform 0.2s; }
-          .email-button:hover { transform: translateY(-2px); box-shadow: 0 8px 24px rgba(59,130,246,0.4); }
-          .email-footer { background: #f9fafb; border-radius: 12px; padding: 24px; margin-top: 32px; text-align: center; color: #6b7280; font-size: 14px; }
-          .benefits-list { background: #f8fafc; border-radius: 12px; padding: 24px; margin: 24px 0; }
-          .benefit-item { display: flex; align-items: center; margin-bottom: 12px; font-size: 16px; color: #374151; }
-          .benefit-check { color: #10b981; font-weight: 700; margin-right: 12px; font-size: 18px; }
-          @media (max-width: 600px) { 
-            .email-container { padding: 10px; } 
-            .email-card { padding: 24px; margin: 10px 0; }
-            .email-title { font-size: 26px; }
-            .email-button { padding: 14px 32px; font-size: 15px; }
-          }
-        `
-        styleTag = modernCSS + styleTag
-        $('style').html(styleTag)
+      // Marcadores procurados em todos os blocos <style> (html() só devolveria o primeiro,
+      // e regravar $('style') copiava esse primeiro bloco para todos os outros)
+      const $styles = $('style')
+      let styleMarkers = 0
+      $styles.each((_, element) => {
+        styleMarkers |= scanStyleMarkers($(element).html() || '')
+      })
+      let precompiledRules: readonly InlineCSSRule[] = []
+      
+      // Decidir uma única vez e escrever o <style> no máximo uma vez
+      // (marcadores do CSS localizados em uma única varredura)
+      if (!(styleMarkers & STYLE_HAS_MODERN_CSS)) {
+        // Aplicar CSS moderno se não existir (já inclui body e font-size base)
+        // As regras já vêm pré-compiladas e são aplicadas antes das do documento
+        precompiledRules = MODERN_EMAIL_RULES
+      } else if (!(styleMarkers & STYLE_HAS_BODY_RULE)) {
+        // Garantir font-size base se necessário (apenas no último bloco)
+        const $lastStyle = $styles.last()
+        $lastStyle.html(($lastStyle.html() || '') + BASE_BODY_CSS)
       }
       
-      // Garantir font-size base se necessário
-      if (!styleTag.includes('body') || !styleTag.includes('font-size')) {
-        if (!styleTag.includes('body')) {
-          styleTag += '\nbody { font-size: 16px; line-height: 1.6; font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif; }'
+      // 🔥 APLICAR CSS INLINE
+      // Reaproveita a mesma árvore - um único parse e uma única serialização
+      try {
+        // O retorno indica se havia CSS para aplicar - só reporta o inline quando ele ocorreu
+        if (inlineStylesInDocument($, precompiledRules)) {
+          logger.info('CSS inline aplicado com sucesso')
+        } else {
+          logger.debug('Nenhum <style> para aplicar como CSS inline')
         }
-        $('style').html(styleTag)
+      } catch (inlineError) {
+        logger.error('Erro ao aplicar CSS inline:', inlineError)
       }
       
       return $.html()
@@ -723,28 +1128,27 @@ IMAGENS: ${imageUrls.join(', ')}`
 
   private extractSubject(userInput: string, existingHTML?: string): string {
     if (existingHTML) {
-      const titleMatch = existingHTML.match(/<title>([^<]+)<\/title>/i)
+      const titleMatch = TITLE_TAG_REGEX.exec(existingHTML)
       if (titleMatch && titleMatch[1]) {
         return titleMatch[1]
       }
     }
     
-    const input = userInput.toLowerCase()
-    
-    if (input.includes('promocional') || input.includes('produto') || input.includes('oferta')) {
-      return 'Oferta Especial - Não Perca'
-    } else if (input.includes('newsletter') || input.includes('novidades')) {
-      return 'Newsletter - Principais Novidades'
-    } else if (input.includes('boas-vindas') || input.includes('bem-vindo')) {
-      return 'Bem-vindo! Que bom ter você conosco'
-    } else if (input.includes('fitness') || input.includes('exercício')) {
-      return 'Transforme Seu Corpo - Comece Hoje'
-    } else {
-      return 'Email Personalizado'
+    // Uma única varredura coleta a categoria de maior prioridade
+    let bestRule = SUBJECT_RULES.length
+    SUBJECT_KEYWORD_REGEX.lastIndex = 0
+    let match: RegExpExecArray | null
+    while (bestRule !== 0 && (match = SUBJECT_KEYWORD_REGEX.exec(userInput)) !== null) {
+      const ruleIndex = SUBJECT_RULE_BY_KEYWORD.get(match[0].toLowerCase())!
+      if (ruleIndex < bestRule) {
+        bestRule = ruleIndex
+      }
     }
+    
+    return bestRule < SUBJECT_RULES.length ? SUBJECT_RULES[bestRule].subject : 'Email Personalizado'
   }
 
-  public async modifyHTML(
+  public modifyHTML(
     instructions: string, 
     existingHTML: string = '', 
     imageUrls?: string[],
@@ -790,16 +1194,37 @@ ${existingHTML}`
     })
   }
 
-  public async healthCheck(): Promise<boolean> {
+  /**
+   * Verifica se a API do OpenRouter responde.
+   * O resultado é reaproveitado por `maxAgeMs` (e chamadas simultâneas
+   * compartilham a mesma requisição), para que o endpoint de health não consulte a API
+   * a cada acesso. `maxAgeMs = 0` força uma verificação nova.
+   */
+  public healthCheck(maxAgeMs: number = HEALTH_CHECK_CACHE_TTL): Promise<boolean> {
+    const now = Date.now()
+    if (this.healthCheckResult && now - this.healthCheckStartedAt < maxAgeMs) {
+      return this.healthCheckResult
+    }
+
+    this.healthCheckStartedAt = now
+    this.healthCheckResult = this.checkHealth()
+    return this.healthCheckResult
+  }
+
+  private async checkHealth(): Promise<boolean> {
     try {
       if (!this.apiKey) {
         return false
       }
 
-      const response = await this.client.get('/models')
+      // Status HTTP não-200 resolve normalmente em vez de lançar exceção
+      const response = await this.client.get('/models', {
+        validateStatus: () => true
+      })
       return response.status === 200
-    } catch (error) {
-      logger.error('Health check IA falhou:', error)
+    } catch (error: any) {
+      // Apenas falhas de rede/timeout chegam aqui
+      logger.error('Health check IA falhou:', error.message)
       return false
     }
   }
@@ -814,21 +1239,29 @@ ${existingHTML}`
 
   public async processMultiple(requests: IARequest[]): Promise<IAResponse[]> {
     const maxConcurrent = Math.min(this.maxConcurrent, requests.length)
-    const results: IAResponse[] = []
+    const results: IAResponse[] = new Array(requests.length)
+    let nextIndex = 0
+    let failed = false
     
-    for (let i = 0; i < requests.length; i += maxConcurrent) {
-      const batch = requests.slice(i, i + maxConcurrent)
-      const batchPromises = batch.map(request => this.generateHTML(request))
-      
-      try {
-        const batchResults = await Promise.all(batchPromises)
-        results.push(...batchResults)
-      } catch (error) {
-        logger.error('Erro no processamento em lote:', error)
-        throw error
+    // Pool com concorrência limitada - cada worker puxa a próxima requisição
+    // assim que termina, sem esperar a requisição mais lenta de um lote fixo
+    const worker = async (): Promise<void> => {
+      while (!failed && nextIndex < requests.length) {
+        const index = nextIndex++
+        results[index] = await this.generateHTML(requests[index])
       }
     }
     
+    try {
+      await Promise.all(Array.from({ length: maxConcurrent }, () => worker().catch(error => {
+        failed = true
+        throw error
+      })))
+    } catch (error) {
+      logger.error('Erro no processamento em lote:', error)
+      throw error
+    }
+    
     return results
   }
 }
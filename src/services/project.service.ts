@@ -37,14 +37,111 @@ interface ProjectMetadata {
 }
 
 // ✅ NOVO: Type guards para validar tipos
+const VALID_PROJECT_TYPES: ReadonlySet<string> = new Set(['campaign', 'newsletter', 'transactional', 'notification', 'other'])
+
 function isValidProjectType(type: string): type is 'campaign' | 'newsletter' | 'transactional' | 'notification' | 'other' {
-  return ['campaign', 'newsletter', 'transactional', 'notification', 'other'].includes(type)
+  return VALID_PROJECT_TYPES.has(type)
 }
 
+const VALID_PROJECT_STATUSES: ReadonlySet<string> = new Set(['active', 'draft', 'archived'])
+
 function isValidProjectStatus(status: string): status is 'active' | 'draft' | 'archived' {
-  return ['active', 'draft', 'archived'].includes(status)
+  return VALID_PROJECT_STATUSES.has(status)
+}
+
+// Formatadores Intl memoizados por (locale, opções) - toLocale*String recria um a cada chamada
+const PT_BR_DATE_FORMAT = new Intl.DateTimeFormat('pt-BR')
+const PT_BR_DATETIME_FORMAT = new Intl.DateTimeFormat('pt-BR', {
+  year: 'numeric',
+  month: 'numeric',
+  day: 'numeric',
+  hour: 'numeric',
+  minute: 'numeric',
+  second: 'numeric'
+})
+const PROJECT_NAME_DATE_FORMAT = new Intl.DateTimeFormat('pt-BR', {
+  day: '2-digit',
+  month: '2-digit',
+  hour: '2-digit',
+  minute: '2-digit'
+})
+
+const PREVIEW_WORD_LIMIT = 20
+// Sequência de tags e/ou espaços em branco -> um único espaço
+const TAG_OR_WHITESPACE_RUN_REGEX = /(?:<[^>]*>|\s)+/g
+// Caracteres removidos do prompt ao gerar o nome do projeto (mantém letras acentuadas e hífen)
+const PROJECT_NAME_INVALID_CHARS_REGEX = /[^\w\s\u00C0-\u024F\u1E00-\u1EFF\-]/gi
+const WHITESPACE_RUN_REGEX = /\s+/g
+const PROJECT_NAME_MAX_LENGTH = 50
+const PROJECT_TEXT_LENGTH = 500
+// Com espaços já colapsados, 2 caracteres além do limite garantem que o corte
+// não depende do trim final do texto completo
+const PROJECT_TEXT_SCAN_LIMIT = PROJECT_TEXT_LENGTH + 2
+
+function buildFallbackSubjectPrefix(industry: string): string {
+  return `Email ${industry.charAt(0).toUpperCase() + industry.slice(1)} - `
+}
+
+// Prefixo do assunto de fallback das indústrias conhecidas (o padrão 'geral' e as listadas pela API);
+// indústria em texto livre monta o seu na hora
+const FALLBACK_SUBJECT_PREFIXES: ReadonlyMap<string, string> = new Map(
+  ['geral', 'technology', 'ecommerce', 'health', 'education', 'finance', 'marketing', 'real-estate', 'food', 'fashion', 'other']
+    .map(industry => [industry, buildFallbackSubjectPrefix(industry)] as [string, string])
+)
+
+function getFallbackSubjectPrefix(industry: string): string {
+  return FALLBACK_SUBJECT_PREFIXES.get(industry) ?? buildFallbackSubjectPrefix(industry)
 }
 
+const PROJECT_FALLBACK_HTML_HEAD = `<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>`
+
+const PROJECT_FALLBACK_HTML_BODY_OPEN = `</title>
+    <style>
+        body { margin: 0; padding: 0; background-color: #f5f5f5; font-family: Arial, sans-serif; }
+        .container { max-width: 600px; margin: 0 auto; background-color: #ffffff; }
+        .header { background: linear-gradient(135deg, #e0e7ff 0%, #c7d2fe 100%); padding: 25px; text-align: center; border-radius: 12px; margin-bottom: 25px; }
+        .content { padding: 40px 30px; }
+        .cta { text-align: center; margin: 20px 0; }
+        .btn { background: #6366f1; color: white; padding: 12px 24px; border-radius: 6px; text-decoration: none; font-weight: bold; display: inline-block; }
+        .footer { background: #6b7280; color: white; padding: 15px; text-align: center; font-size: 12px; }
+        p { font-size: 16px; margin-bottom: 15px; line-height: 1.6; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="content">
+            <div class="header">
+                <h1 style="color: #7c3aed; font-size: 28px; margin: 0;">✨ `
+
+const PROJECT_FALLBACK_HTML_PROMPT_OPEN = `</h1>
+            </div>
+            
+            <p style="color: #374151;">
+                Email baseado em: "<strong>`
+
+const PROJECT_FALLBACK_HTML_TAIL = `</strong>"
+            </p>
+            
+            <p style="color: #374151;">
+                Este email foi gerado automaticamente com HTML responsivo. Você pode editá-lo diretamente no editor ou pedir modificações via chat.
+            </p>
+            
+            <div class="cta">
+                <a href="#" class="btn">Saiba Mais</a>
+            </div>
+        </div>
+        <div class="footer">
+            <p style="margin: 0;">© 2025 MailTrendz - Sistema Inteligente</p>
+        </div>
+    </div>
+</body>
+</html>`
+
 class ProjectService {
   async create(userId: string, projectData: CreateProjectDto, userToken?: string): Promise<Project> {
     try {
@@ -177,7 +274,7 @@ class ProjectService {
       }
       
       if (!projectName || projectName.length === 0) {
-        const fallbackName = `Projeto ${new Date().toLocaleString('pt-BR')}`
+        const fallbackName = `Projeto ${PT_BR_DATETIME_FORMAT.format(new Date())}`
         logger.warn(`Project name was empty, using fallback: "${fallbackName}"`)
         projectName = fallbackName
       }
@@ -447,50 +544,10 @@ class ProjectService {
     const prompt = projectData.prompt || 'Email personalizado'
     const industry = projectData.industry || 'geral'
     
-    const subject = `Email ${industry.charAt(0).toUpperCase() + industry.slice(1)} - ${new Date().toLocaleDateString('pt-BR')}`
+    const subject = getFallbackSubjectPrefix(industry) + PT_BR_DATE_FORMAT.format(new Date())
     
-    const html = `<!DOCTYPE html>
-<html lang="pt-BR">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>${subject}</title>
-    <style>
-        body { margin: 0; padding: 0; background-color: #f5f5f5; font-family: Arial, sans-serif; }
-        .container { max-width: 600px; margin: 0 auto; background-color: #ffffff; }
-        .header { background: linear-gradient(135deg, #e0e7ff 0%, #c7d2fe 100%); padding: 25px; text-align: center; border-radius: 12px; margin-bottom: 25px; }
-        .content { padding: 40px 30px; }
-        .cta { text-align: center; margin: 20px 0; }
-        .btn { background: #6366f1; color: white; padding: 12px 24px; border-radius: 6px; text-decoration: none; font-weight: bold; display: inline-block; }
-        .footer { background: #6b7280; color: white; padding: 15px; text-align: center; font-size: 12px; }
-        p { font-size: 16px; margin-bottom: 15px; line-height: 1.6; }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="content">
-            <div class="header">
-                <h1 style="color: #7c3aed; font-size: 28px; margin: 0;">✨ ${subject}</h1>
-            </div>
-            
-            <p style="color: #374151;">
-                Email baseado em: "<strong>${prompt}</strong>"
-            </p>
-            
-            <p style="color: #374151;">
-                Este email foi gerado automaticamente com HTML responsivo. Você pode editá-lo diretamente no editor ou pedir modificações via chat.
-            </p>
-            
-            <div class="cta">
-                <a href="#" class="btn">Saiba Mais</a>
-            </div>
-        </div>
-        <div class="footer">
-            <p style="margin: 0;">© 2025 MailTrendz - Sistema Inteligente</p>
-        </div>
-    </div>
-</body>
-</html>`
+    const html = PROJECT_FALLBACK_HTML_HEAD + subject + PROJECT_FALLBACK_HTML_BODY_OPEN + subject +
+      PROJECT_FALLBACK_HTML_PROMPT_OPEN + prompt + PROJECT_FALLBACK_HTML_TAIL
 
     return { html, subject }
   }
@@ -498,30 +555,60 @@ class ProjectService {
   private htmlToText(html: string): string {
     if (!html) return ''
     
-    return html
-      .replace(/<[^>]*>/g, ' ')
-      .replace(/\s+/g, ' ')
-      .trim()
-      .substring(0, 500)
+    // Tags e espaços em branco colapsados em uma única passada que para
+    // assim que o texto atinge o limite (não percorre o restante de HTMLs grandes)
+    const parts: string[] = []
+    let length = 0
+    let position = 0
+    let match: RegExpExecArray | null
+    
+    TAG_OR_WHITESPACE_RUN_REGEX.lastIndex = 0
+    while (length < PROJECT_TEXT_SCAN_LIMIT && (match = TAG_OR_WHITESPACE_RUN_REGEX.exec(html)) !== null) {
+      if (match.index > position) {
+        const segment = html.substring(position, match.index)
+        parts.push(segment)
+        length += segment.length
+      }
+      if (length > 0) {
+        parts.push(' ')
+        length++
+      }
+      position = match.index + match[0].length
+    }
+    
+    if (length < PROJECT_TEXT_SCAN_LIMIT && position < html.length) {
+      parts.push(html.substring(position))
+    }
+    
+    return parts.join('').trimEnd().substring(0, PROJECT_TEXT_LENGTH)
   }
 
   private generatePreviewText(html: string): string {
     if (!html) return ''
     
     const text = this.htmlToText(html)
-    const words = text.split(' ').slice(0, 20)
-    return words.join(' ') + (words.length >= 20 ? '...' : '')
+    
+    // Localiza o fim da 20ª palavra com indexOf em vez de split + slice + join
+    // (htmlToText já normaliza para espaços simples)
+    let end = -1
+    let spaces = 0
+    while (spaces < PREVIEW_WORD_LIMIT) {
+      const next = text.indexOf(' ', end + 1)
+      if (next === -1) break
+      end = next
+      spaces++
+    }
+    
+    if (spaces === PREVIEW_WORD_LIMIT) {
+      return text.substring(0, end) + '...'
+    }
+    return text + (spaces === PREVIEW_WORD_LIMIT - 1 ? '...' : '')
   }
 
   private generateProjectName(prompt: string): string {
     try {
       const now = new Date()
-      const defaultName = `Projeto ${now.toLocaleDateString('pt-BR', { 
-        day: '2-digit', 
-        month: '2-digit',
-        hour: '2-digit',
-        minute: '2-digit'
-      })}`
+      const defaultName = `Projeto ${PROJECT_NAME_DATE_FORMAT.format(now)}`
       
       if (!prompt || typeof prompt !== 'string' || prompt.trim().length === 0) {
         logger.info('No valid prompt provided, using default name')
@@ -530,8 +617,8 @@ class ProjectService {
       
       const cleanPrompt = prompt
         .trim()
-        .replace(/[^\w\s\u00C0-\u024F\u1E00-\u1EFF\-]/gi, '')
-        .replace(/\s+/g, ' ')
+        .replace(PROJECT_NAME_INVALID_CHARS_REGEX, '')
+        .replace(WHITESPACE_RUN_REGEX, ' ')
         .trim()
       
       if (!cleanPrompt || cleanPrompt.length === 0) {
@@ -539,13 +626,13 @@ class ProjectService {
         return defaultName
       }
       
-      const words = cleanPrompt.split(' ').filter(word => word.length > 0)
-      let name = ''
-      
-      for (const word of words) {
-        const potentialName = name + (name ? ' ' : '') + word
-        if (potentialName.length > 50) break
-        name = potentialName
+      // cleanPrompt já tem as palavras separadas por um único espaço, então as
+      // palavras inteiras que cabem no limite são simplesmente o prefixo até o último espaço
+      // antes do corte - sem quebrar o prompt inteiro em palavras e remontar uma a uma
+      let name = cleanPrompt
+      if (name.length > PROJECT_NAME_MAX_LENGTH) {
+        const cut = name.lastIndexOf(' ', PROJECT_NAME_MAX_LENGTH)
+        name = cut === -1 ? '' : name.substring(0, cut)
       }
       
       if (!name || name.length < 3) {
@@ -563,12 +650,7 @@ class ProjectService {
     } catch (error) {
       logger.error('Error generating project name:', error)
       const now = new Date()
-      return `Projeto ${now.toLocaleDateString('pt-BR', { 
-        day: '2-digit', 
-        month: '2-digit',
-        hour: '2-digit',
-        minute: '2-digit'
-      })}`
+      return `Projeto ${PROJECT_NAME_DATE_FORMAT.format(now)}`
     }
   }
 
@@ -855,13 +937,21 @@ class ProjectService {
       if (projects && projects.length > 0) {
         let totalConversionRate = 0
         let projectsWithOpens = 0
+        // Aberturas e cliques somados por tipo na mesma passada - as médias saem
+        // desses acumulados, sem refiltrar e somar a lista inteira de projetos para cada tipo
+        const sumsByType = new Map<string, { opens: number, clicks: number }>()
 
         projects.forEach((project: any) => {
-          if (!stats.byType[project.type]) {
+          let typeSums = sumsByType.get(project.type)
+          if (!typeSums) {
             stats.byType[project.type] = { count: 0, avgOpens: 0, avgClicks: 0 }
+            typeSums = { opens: 0, clicks: 0 }
+            sumsByType.set(project.type, typeSums)
           }
           
           stats.byType[project.type].count++
+          typeSums.opens += project.opens
+          typeSums.clicks += project.clicks
           stats.totalOpens += project.opens
           stats.totalClicks += project.clicks
           stats.totalUses += project.uses
@@ -872,10 +962,10 @@ class ProjectService {
           }
         })
 
-        Object.keys(stats.byType).forEach(type => {
-          const typeProjects = projects.filter((p: any) => p.type === type)
-          stats.byType[type].avgOpens = typeProjects.reduce((sum: number, p: any) => sum + p.opens, 0) / typeProjects.length
-          stats.byType[type].avgClicks = typeProjects.reduce((sum: number, p: any) => sum + p.clicks, 0) / typeProjects.length
+        sumsByType.forEach((typeSums, type) => {
+          const typeStats = stats.byType[type]
+          typeStats.avgOpens = typeSums.opens / typeStats.count
+          typeStats.avgClicks = typeSums.clicks / typeStats.count
         })
 
         stats.avgConversionRate = projectsWithOpens > 0 ? totalConversionRate / projectsWithOpens : 0
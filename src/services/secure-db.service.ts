@@ -1,5 +1,6 @@
 import { supabase, supabaseAdmin } from '../config/supabase.config'
 import { logger } from '../utils/logger'
+import { performance } from 'perf_hooks'
 
 /**
  * Secure Database Service
@@ -15,7 +16,7 @@ class SecureDbService {
     callback: () => Promise<T>,
     context?: Record<string, any>
   ): Promise<T> {
-    const startTime = Date.now()
+    const startTime = performance.now()
     
     try {
       // Log início da operação
@@ -32,7 +33,7 @@ class SecureDbService {
       logger.info('✅ [ADMIN-OP] Admin operation completed successfully', {
         operation,
         userId,
-        duration: Date.now() - startTime,
+        duration: Math.round(performance.now() - startTime),
         context
       })
       
@@ -42,7 +43,7 @@ class SecureDbService {
       logger.error('❌ [ADMIN-OP] Admin operation failed', {
         operation,
         userId,
-        duration: Date.now() - startTime,
+        duration: Math.round(performance.now() - startTime),
         error: error instanceof Error ? error.message : error,
         context
       })
@@ -9,9 +9,11 @@ import {
   SubscriptionType
 } from '../types/subscription.types'
 
+const SUBSCRIPTION_TYPES: ReadonlySet<string> = new Set(['free', 'starter', 'enterprise', 'unlimited'])
+
 // ✅ HELPER: Validar se string é um tipo de assinatura válido
 function isValidSubscriptionType(planType: string): planType is SubscriptionType {
-  return ['free', 'starter', 'enterprise', 'unlimited'].includes(planType)
+  return SUBSCRIPTION_TYPES.has(planType)
 }
 
 class SubscriptionService {
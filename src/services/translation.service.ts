@@ -1,5 +1,7 @@
 import axios, { AxiosInstance } from 'axios'
+import { performance } from 'perf_hooks'
 import { logger } from '../utils/logger'
+import { keepAliveHttpAgent, keepAliveHttpsAgent } from '../config/http-agent.config'
 
 export interface TranslationRequest {
   text: string
@@ -22,12 +24,50 @@ export interface TranslationResponse {
   }
 }
 
+const LANGUAGE_NAMES = Object.freeze({
+  'pt': 'português brasileiro',
+  'en': 'inglês americano'
+})
+
+// Máximo de traduções mantidas em cache - ao atingir o limite, a mais antiga dá lugar à nova
+const TRANSLATION_CACHE_MAX_ENTRIES = 500
+
+// As instruções do prompt dependem apenas do par de idiomas - montadas uma
+// única vez por par e reaproveitadas; por requisição resta só concatenar o texto a traduzir
+const TRANSLATION_PROMPT_HEADS = new Map<string, string>()
+const TRANSLATION_PROMPT_TAIL = `"
+
+Responda APENAS com a tradução, sem aspas ou formatação adicional.`
+
+function buildTranslationPrompt(text: string, fromLanguage: TranslationRequest['fromLanguage'], toLanguage: TranslationRequest['toLanguage']): string {
+  const pairKey = fromLanguage + '>' + toLanguage
+  let head = TRANSLATION_PROMPT_HEADS.get(pairKey)
+  
+  if (head === undefined) {
+    head = `Você é um especialista em tradução. Traduza EXATAMENTE o seguinte texto de ${LANGUAGE_NAMES[fromLanguage]} para ${LANGUAGE_NAMES[toLanguage]}.
+
+IMPORTANTE:
+- Mantenha o tom e estilo original
+- Preserve a intenção e contexto
+- Se for nome de projeto de email, mantenha naturalidade
+- Não adicione explicações, apenas a tradução
+- Se contiver termos técnicos de email marketing, use equivalentes adequados
+
+Texto para traduzir: "`
+    TRANSLATION_PROMPT_HEADS.set(pairKey, head)
+  }
+  
+  return head + text + TRANSLATION_PROMPT_TAIL
+}
+
 class TranslationService {
   private client: AxiosInstance
   private apiKey: string
   private model: string
   private baseUrl: string
-  private cache: Map<string, TranslationResponse> = new Map()
+  // Cada entrada guarda o instante da gravação como número - a checagem de TTL
+  // é uma subtração, sem converter o generatedAt (ISO) de volta em Date a cada leitura
+  private cache: Map<string, { translation: TranslationResponse; cachedAt: number }> = new Map()
   private readonly cacheTTL = 1000 * 60 * 60 * 24 // 24 hours
 
   constructor() {
@@ -42,6 +82,8 @@ class TranslationService {
     this.client = axios.create({
       baseURL: this.baseUrl,
       timeout: 30000,
+      httpAgent: keepAliveHttpAgent,
+      httpsAgent: keepAliveHttpsAgent,
       headers: {
         'Authorization': `Bearer ${this.apiKey}`,
         'Content-Type': 'application/json',
@@ -50,8 +92,9 @@ class TranslationService {
     })
   }
 
-  private getCacheKey(text: string, fromLang: string, toLang: string): string {
-    return `${fromLang}-${toLang}-${text.toLowerCase().trim()}`
+  // Recebe o texto já sem espaços nas pontas (calculado uma única vez em translateText)
+  private getCacheKey(trimmedText: string, fromLang: string, toLang: string): string {
+    return `${fromLang}-${toLang}-${trimmedText.toLowerCase()}`
   }
 
   private getCachedTranslation(cacheKey: string): TranslationResponse | null {
@@ -59,26 +102,33 @@ class TranslationService {
     if (!cached) return null
 
     // Check if cache is still valid
-    const now = Date.now()
-    const cacheTime = new Date(cached.metadata.generatedAt).getTime()
-    if (now - cacheTime > this.cacheTTL) {
+    if (Date.now() - cached.cachedAt > this.cacheTTL) {
       this.cache.delete(cacheKey)
       return null
     }
 
-    return cached
+    return cached.translation
   }
 
+  // Cache com capacidade fixa - o Map mantém a ordem de inserção, então a entrada
+  // mais antiga é a primeira chave e sai em O(1), sem ordenar nem copiar nada
   private setCachedTranslation(cacheKey: string, translation: TranslationResponse): void {
-    this.cache.set(cacheKey, translation)
+    if (this.cache.size >= TRANSLATION_CACHE_MAX_ENTRIES && !this.cache.has(cacheKey)) {
+      const oldestKey = this.cache.keys().next().value
+      if (oldestKey !== undefined) {
+        this.cache.delete(oldestKey)
+      }
+    }
+    this.cache.set(cacheKey, { translation, cachedAt: Date.now() })
   }
 
   async translateText(request: TranslationRequest): Promise<TranslationResponse> {
-    const startTime = Date.now()
+    const startTime = performance.now()
     
     try {
       // Input validation
-      if (!request.text?.trim()) {
+      const trimmedText = request.text?.trim()
+      if (!trimmedText) {
         throw new Error('Texto para tradução não pode estar vazio')
       }
 
@@ -92,7 +142,7 @@ class TranslationService {
           confidence: 1.0,
           metadata: {
             model: 'no-translation-needed',
-            processingTime: Date.now() - startTime,
+            processingTime: Math.round(performance.now() - startTime),
             generatedAt: new Date().toISOString(),
             service: 'translation-service'
           }
@@ -100,7 +150,7 @@ class TranslationService {
       }
 
       // Check cache first
-      const cacheKey = this.getCacheKey(request.text, request.fromLanguage, request.toLanguage)
+      const cacheKey = this.getCacheKey(trimmedText, request.fromLanguage, request.toLanguage)
       const cached = this.getCachedTranslation(cacheKey)
       if (cached) {
         logger.info(`Tradução obtida do cache: ${request.text} -> ${cached.translatedText}`)
@@ -112,23 +162,7 @@ class TranslationService {
       }
 
       // Prepare translation prompt
-      const languageNames = {
-        'pt': 'português brasileiro',
-        'en': 'inglês americano'
-      }
-
-      const prompt = `Você é um especialista em tradução. Traduza EXATAMENTE o seguinte texto de ${languageNames[request.fromLanguage]} para ${languageNames[request.toLanguage]}.
-
-IMPORTANTE:
-- Mantenha o tom e estilo original
-- Preserve a intenção e contexto
-- Se for nome de projeto de email, mantenha naturalidade
-- Não adicione explicações, apenas a tradução
-- Se contiver termos técnicos de email marketing, use equivalentes adequados
-
-Texto para traduzir: "${request.text}"
-
-Responda APENAS com a tradução, sem aspas ou formatação adicional.`
+      const prompt = buildTranslationPrompt(request.text, request.fromLanguage, request.toLanguage)
 
       // Make API request
       const response = await this.client.post('/chat/completions', {
@@ -159,7 +193,7 @@ Responda APENAS com a tradução, sem aspas ou formatação adicional.`
         confidence: 0.95, // High confidence for Claude
         metadata: {
           model: this.model,
-          processingTime: Date.now() - startTime,
+          processingTime: Math.round(performance.now() - startTime),
           generatedAt: new Date().toISOString(),
           service: 'translation-service'
         }
@@ -190,7 +224,7 @@ Responda APENAS com a tradução, sem aspas ou formatação adicional.`
         confidence: 0.0,
         metadata: {
           model: 'fallback',
-          processingTime: Date.now() - startTime,
+          processingTime: Math.round(performance.now() - startTime),
           generatedAt: new Date().toISOString(),
           service: 'translation-service'
         }
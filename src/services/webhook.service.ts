@@ -10,6 +10,271 @@ interface WebhookProcessingResult {
   data?: any
 }
 
+const WELCOME_EMAIL_HEAD = `
+    <!DOCTYPE html>
+    <html lang="pt-BR">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Bem-vindo ao MailTrendz</title>
+        <style>
+            * {
+                margin: 0;
+                padding: 0;
+                box-sizing: border-box;
+            }
+            
+            body {
+                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+                line-height: 1.6;
+                color: #333;
+                background-color: #f8f9fa;
+            }
+            
+            .container {
+                max-width: 600px;
+                margin: 0 auto;
+                background-color: #ffffff;
+                border-radius: 8px;
+                overflow: hidden;
+                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+            }
+            
+            .header {
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                color: white;
+                text-align: center;
+                padding: 40px 20px;
+            }
+            
+            .logo {
+                width: 60px;
+                height: 60px;
+                background-color: rgba(255, 255, 255, 0.2);
+                border-radius: 50%;
+                margin: 0 auto 20px;
+                display: flex;
+                align-items: center;
+                justify-content: center;
+                font-size: 24px;
+                font-weight: bold;
+            }
+            
+            .header h1 {
+                font-size: 28px;
+                margin-bottom: 8px;
+            }
+            
+            .header p {
+                font-size: 16px;
+                opacity: 0.9;
+            }
+            
+            .content {
+                padding: 40px 30px;
+            }
+            
+            .welcome-text {
+                text-align: center;
+                margin-bottom: 30px;
+            }
+            
+            .welcome-text h2 {
+                color: #2d3748;
+                margin-bottom: 12px;
+                font-size: 24px;
+            }
+            
+            .welcome-text p {
+                color: #718096;
+                font-size: 16px;
+            }
+            
+            .plan-badge {
+                background: linear-gradient(135deg, #48bb78, #38a169);
+                color: white;
+                padding: 8px 20px;
+                border-radius: 20px;
+                display: inline-block;
+                font-weight: 600;
+                font-size: 14px;
+                margin: 20px 0;
+                text-transform: uppercase;
+                letter-spacing: 1px;
+            }
+            
+            .features {
+                background-color: #f7fafc;
+                border-radius: 8px;
+                padding: 25px;
+                margin: 30px 0;
+            }
+            
+            .features h3 {
+                color: #2d3748;
+                margin-bottom: 15px;
+                font-size: 18px;
+            }
+            
+            .features ul {
+                list-style: none;
+                padding: 0;
+            }
+            
+            .features li {
+                padding: 8px 0;
+                color: #4a5568;
+                position: relative;
+                padding-left: 25px;
+            }
+            
+            .features li:before {
+                content: "✓";
+                position: absolute;
+                left: 0;
+                color: #48bb78;
+                font-weight: bold;
+            }
+            
+            .cta-button {
+                text-align: center;
+                margin: 40px 0;
+            }
+            
+            .btn {
+                display: inline-block;
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                color: white;
+                text-decoration: none;
+                padding: 15px 35px;
+                border-radius: 8px;
+                font-weight: 600;
+                font-size: 16px;
+                transition: transform 0.2s ease;
+            }
+            
+            .btn:hover {
+                transform: translateY(-2px);
+            }
+            
+            .security-note {
+                background-color: #fef5e7;
+                border-left: 4px solid #f6ad55;
+                padding: 15px;
+                margin: 25px 0;
+                border-radius: 0 4px 4px 0;
+            }
+            
+            .security-note p {
+                color: #744210;
+                font-size: 14px;
+                margin: 0;
+            }
+            
+            .footer {
+                background-color: #2d3748;
+                color: #a0aec0;
+                text-align: center;
+                padding: 30px 20px;
+            }
+            
+            .footer p {
+                margin-bottom: 10px;
+                font-size: 14px;
+            }
+            
+            .footer a {
+                color: #81e6d9;
+                text-decoration: none;
+            }
+            
+            @media (max-width: 600px) {
+                .container {
+                    margin: 0;
+                    border-radius: 0;
+                }
+                
+                .content {
+                    padding: 30px 20px;
+                }
+                
+                .header {
+                    padding: 30px 20px;
+                }
+                
+                .header h1 {
+                    font-size: 24px;
+                }
+            }
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <div class="logo">MT</div>
+                <h1>🎉 Bem-vindo ao MailTrendz!</h1>
+                <p>Sua jornada para emails incríveis começa agora</p>
+            </div>
+            
+            <div class="content">
+                <div class="welcome-text">
+                    <h2>Olá, `
+
+const WELCOME_EMAIL_AFTER_NAME = `!</h2>
+                    <p>Seu pagamento foi processado com sucesso e sua conta premium está pronta para usar!</p>
+                    <div class="plan-badge">Conta Premium Ativa</div>
+                </div>
+                
+                <div class="features">
+                    <h3>🚀 O que você pode fazer agora:</h3>
+                    <ul>
+                        <li>Criar emails profissionais ilimitados</li>
+                        <li>Usar todas as funcionalidades premium</li>
+                        <li>Exportar seus emails em HTML</li>
+                        <li>Suporte prioritário 24/7</li>
+                        <li>Análise avançada de performance</li>
+                    </ul>
+                </div>
+                
+                <div class="cta-button">
+                    <a href="`
+
+const WELCOME_EMAIL_AFTER_ACCESS_URL = `" class="btn">
+                        🚀 Acessar Minha Conta Agora
+                    </a>
+                </div>
+                
+                <div class="security-note">
+                    <p><strong>🔐 Acesso Seguro:</strong> Este link faz login automático na sua conta e é válido por 24 horas. Não compartilhe com terceiros.</p>
+                </div>
+                
+                <div style="text-align: center; margin-top: 30px; color: #718096;">
+                    <p><strong>Detalhes da sua conta:</strong></p>
+                    <p>📧 Email: `
+
+const WELCOME_EMAIL_AFTER_EMAIL = `</p>
+                    <p>⚡ Status: Premium Ativo</p>
+                    <p>📅 Ativação: `
+
+const WELCOME_EMAIL_TAIL = `</p>
+                </div>
+            </div>
+            
+            <div class="footer">
+                <p><strong>MailTrendz</strong> - Criando emails que convertem</p>
+                <p>Precisa de ajuda? Responda este email ou acesse nosso <a href="mailto:suporte@mailtrendz.com">suporte</a></p>
+                <p style="font-size: 12px; margin-top: 15px;">
+                    Este email foi enviado automaticamente após sua compra.<br>
+                    © 2025 MailTrendz. Todos os direitos reservados.
+                </p>
+            </div>
+        </div>
+    </body>
+    </html>
+    `
+
+const WELCOME_EMAIL_DATE_FORMAT = new Intl.DateTimeFormat('pt-BR')
+
 export class WebhookService {
   private stripe: Stripe
   private webhookSecret: string
@@ -990,260 +1255,13 @@ export class WebhookService {
    * 🎨 Gera template HTML profissional para email de boas-vindas
    */
   private getWelcomeEmailTemplate(email: string, name: string, accessUrl: string): string {
-    return `
-    <!DOCTYPE html>
-    <html lang="pt-BR">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Bem-vindo ao MailTrendz</title>
-        <style>
-            * {
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }
-            
-            body {
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-                line-height: 1.6;
-                color: #333;
-                background-color: #f8f9fa;
-            }
-            
-            .container {
-                max-width: 600px;
-                margin: 0 auto;
-                background-color: #ffffff;
-                border-radius: 8px;
-                overflow: hidden;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            }
-            
-            .header {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                text-align: center;
-                padding: 40px 20px;
-            }
-            
-            .logo {
-                width: 60px;
-                height: 60px;
-                background-color: rgba(255, 255, 255, 0.2);
-                border-radius: 50%;
-                margin: 0 auto 20px;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                font-size: 24px;
-                font-weight: bold;
-            }
-            
-            .header h1 {
-                font-size: 28px;
-                margin-bottom: 8px;
-            }
-            
-            .header p {
-                font-size: 16px;
-                opacity: 0.9;
-            }
-            
-            .content {
-                padding: 40px 30px;
-            }
-            
-            .welcome-text {
-                text-align: center;
-                margin-bottom: 30px;
-            }
-            
-            .welcome-text h2 {
-                color: #2d3748;
-                margin-bottom: 12px;
-                font-size: 24px;
-            }
-            
-            .welcome-text p {
-                color: #718096;
-                font-size: 16px;
-            }
-            
-            .plan-badge {
-                background: linear-gradient(135deg, #48bb78, #38a169);
-                color: white;
-                padding: 8px 20px;
-                border-radius: 20px;
-                display: inline-block;
-                font-weight: 600;
-                font-size: 14px;
-                margin: 20px 0;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-            }
-            
-            .features {
-                background-color: #f7fafc;
-                border-radius: 8px;
-                padding: 25px;
-                margin: 30px 0;
-            }
-            
-            .features h3 {
-                color: #2d3748;
-                margin-bottom: 15px;
-                font-size: 18px;
-            }
-            
-            .features ul {
-                list-style: none;
-                padding: 0;
-            }
-            
-            .features li {
-                padding: 8px 0;
-                color: #4a5568;
-                position: relative;
-                padding-left: 25px;
-            }
-            
-            .features li:before {
-                content: "✓";
-                position: absolute;
-                left: 0;
-                color: #48bb78;
-                font-weight: bold;
-            }
-            
-            .cta-button {
-                text-align: center;
-                margin: 40px 0;
-            }
-            
-            .btn {
-                display: inline-block;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                text-decoration: none;
-                padding: 15px 35px;
-                border-radius: 8px;
-                font-weight: 600;
-                font-size: 16px;
-                transition: transform 0.2s ease;
-            }
-            
-            .btn:hover {
-                transform: translateY(-2px);
-            }
-            
-            .security-note {
-                background-color: #fef5e7;
-                border-left: 4px solid #f6ad55;
-                padding: 15px;
-                margin: 25px 0;
-                border-radius: 0 4px 4px 0;
-            }
-            
-            .security-note p {
-                color: #744210;
-                font-size: 14px;
-                margin: 0;
-            }
-            
-            .footer {
-                background-color: #2d3748;
-                color: #a0aec0;
-                text-align: center;
-                padding: 30px 20px;
-            }
-            
-            .footer p {
-                margin-bottom: 10px;
-                font-size: 14px;
-            }
-            
-            .footer a {
-                color: #81e6d9;
-                text-decoration: none;
-            }
-            
-            @media (max-width: 600px) {
-                .container {
-                    margin: 0;
-                    border-radius: 0;
-                }
-                
-                .content {
-                    padding: 30px 20px;
-                }
-                
-                .header {
-                    padding: 30px 20px;
-                }
-                
-                .header h1 {
-                    font-size: 24px;
-                }
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <div class="logo">MT</div>
-                <h1>🎉 Bem-vindo ao MailTrendz!</h1>
-                <p>Sua jornada para emails incríveis começa agora</p>
-            </div>
-            
-            <div class="content">
-                <div class="welcome-text">
-                    <h2>Olá, ${name}!</h2>
-                    <p>Seu pagamento foi processado com sucesso e sua conta premium está pronta para usar!</p>
-                    <div class="plan-badge">Conta Premium Ativa</div>
-                </div>
-                
-                <div class="features">
-                    <h3>🚀 O que você pode fazer agora:</h3>
-                    <ul>
-                        <li>Criar emails profissionais ilimitados</li>
-                        <li>Usar todas as funcionalidades premium</li>
-                        <li>Exportar seus emails em HTML</li>
-                        <li>Suporte prioritário 24/7</li>
-                        <li>Análise avançada de performance</li>
-                    </ul>
-                </div>
-                
-                <div class="cta-button">
-                    <a href="${accessUrl}" class="btn">
-                        🚀 Acessar Minha Conta Agora
-                    </a>
-                </div>
-                
-                <div class="security-note">
-                    <p><strong>🔐 Acesso Seguro:</strong> Este link faz login automático na sua conta e é válido por 24 horas. Não compartilhe com terceiros.</p>
-                </div>
-                
-                <div style="text-align: center; margin-top: 30px; color: #718096;">
-                    <p><strong>Detalhes da sua conta:</strong></p>
-                    <p>📧 Email: ${email}</p>
-                    <p>⚡ Status: Premium Ativo</p>
-                    <p>📅 Ativação: ${new Date().toLocaleDateString('pt-BR')}</p>
-                </div>
-            </div>
-            
-            <div class="footer">
-                <p><strong>MailTrendz</strong> - Criando emails que convertem</p>
-                <p>Precisa de ajuda? Responda este email ou acesse nosso <a href="mailto:suporte@mailtrendz.com">suporte</a></p>
-                <p style="font-size: 12px; margin-top: 15px;">
-                    Este email foi enviado automaticamente após sua compra.<br>
-                    © 2025 MailTrendz. Todos os direitos reservados.
-                </p>
-            </div>
-        </div>
-    </body>
-    </html>
-    `
+    return [
+      WELCOME_EMAIL_HEAD, name,
+      WELCOME_EMAIL_AFTER_NAME, accessUrl,
+      WELCOME_EMAIL_AFTER_ACCESS_URL, email,
+      WELCOME_EMAIL_AFTER_EMAIL, WELCOME_EMAIL_DATE_FORMAT.format(new Date()),
+      WELCOME_EMAIL_TAIL
+    ].join('')
   }
 
   /**
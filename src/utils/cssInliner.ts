@@ -1,39 +1,25 @@
 import * as cheerio from 'cheerio'
 
+const CSS_COMMENT_REGEX = /\/\*[\s\S]*?\*\//g
+const CSS_BRACE_REGEX = /[{}]/g
+const STYLE_TAG_REGEX = /<style[\s>]/i
+const LEADING_SEPARATOR_REGEX = /^;\s*/
+// Tag simples (body, p, h1), classe (.container), id (#header) ou múltiplas tags (h1, h2)
+const SIMPLE_SELECTOR_REGEX = /^(?:[a-zA-Z][a-zA-Z0-9]*|[.#][a-zA-Z][a-zA-Z0-9_-]*|[a-zA-Z][a-zA-Z0-9]*\s*,\s*[a-zA-Z][a-zA-Z0-9]*)$/
+
 export function inlineStyles(html: string): string {
+  // Sem <style> não há o que inlinear - evita parse completo do HTML
+  if (!STYLE_TAG_REGEX.test(html)) {
+    return html
+  }
+  
   try {
     const $ = cheerio.load(html)
     
-    // Extrair CSS das tags <style>
-    let allCSS = ''
-    $('style').each((_, element) => {
-      allCSS += $(element).html() || ''
-    })
-    
-    if (!allCSS) {
+    if (!inlineStylesInDocument($)) {
       return html
     }
     
-    // Parse CSS rules
-    const cssRules = parseCSSRules(allCSS)
-    
-    // Aplicar estilos inline para cada elemento
-    cssRules.forEach(rule => {
-      try {
-        $(rule.selector).each((_, element) => {
-          const $element = $(element)
-          const existingStyle = $element.attr('style') || ''
-          const newStyle = existingStyle + '; ' + rule.declarations
-          $element.attr('style', newStyle.replace(/^;\s*/, ''))
-        })
-      } catch (selectorError) {
-        // Ignora seletores inválidos ou complexos
-      }
-    })
-    
-    // Remover tags <style> após aplicar inline
-    $('style').remove()
-    
     return $.html()
     
   } catch (error) {
@@ -42,28 +28,129 @@ export function inlineStyles(html: string): string {
   }
 }
 
-interface CSSRule {
+/**
+ * Aplica o CSS inline diretamente em um documento já carregado pelo cheerio,
+ * permitindo que quem já fez o parse reaproveite a mesma árvore.
+ * `precompiledRules` (ver compileCSSRules) são aplicadas antes das regras das tags <style>.
+ * Retorna false quando não havia CSS para aplicar (documento inalterado).
+ */
+export function inlineStylesInDocument($: cheerio.CheerioAPI, precompiledRules: readonly InlineCSSRule[] = []): boolean {
+  const $styles = $('style')
+  
+  // Extrair CSS das tags <style>
+  const cssBlocks: string[] = []
+  $styles.each((_, element) => {
+    cssBlocks.push($(element).html() || '')
+  })
+  const allCSS = cssBlocks.join('')
+  
+  if ($styles.length === 0 || (!allCSS && precompiledRules.length === 0)) {
+    return false
+  }
+  
+  // Aplicar estilos inline para cada elemento
+  // O style de cada elemento é acumulado em memória e gravado uma única vez,
+  // em vez de ler/escrever o atributo a cada regra que casa com o elemento
+  const pendingStyles = new Map<any, string>()
+  applyCSSRules($, precompiledRules, pendingStyles)
+  if (allCSS) {
+    applyCSSRules($, parseCSSRules(allCSS), pendingStyles)
+  }
+  pendingStyles.forEach((style, element) => {
+    $(element).attr('style', style)
+  })
+  
+  // Remover tags <style> após aplicar inline
+  $styles.remove()
+  
+  return true
+}
+
+/**
+ * Faz o parse de uma folha de estilo estática uma única vez, para ser reaproveitada
+ * em inlineStylesInDocument sem repetir o parse a cada documento
+ */
+export function compileCSSRules(css: string): readonly InlineCSSRule[] {
+  return Object.freeze(parseCSSRules(css).map(rule => Object.freeze(rule)))
+}
+
+function applyCSSRules($: cheerio.CheerioAPI, cssRules: readonly InlineCSSRule[], pendingStyles: Map<any, string>): void {
+  cssRules.forEach(rule => {
+    try {
+      $(rule.selector).each((_, element) => {
+        const existingStyle = pendingStyles.get(element) ?? ($(element).attr('style') || '')
+        pendingStyles.set(element, appendDeclarations(existingStyle, rule.declarations))
+      })
+    } catch (selectorError) {
+      // Ignora seletores inválidos ou complexos
+    }
+  })
+}
+
+// Equivalente a (existingStyle + '; ' + declarations).replace(/^;\s*/, ''), sem a regex
+// no caso comum (declarations já vem sem espaços nas pontas)
+function appendDeclarations(existingStyle: string, declarations: string): string {
+  if (!existingStyle) {
+    return declarations
+  }
+  
+  const style = existingStyle + '; ' + declarations
+  return existingStyle.charCodeAt(0) === 59 ? style.replace(LEADING_SEPARATOR_REGEX, '') : style
+}
+
+export interface InlineCSSRule {
   selector: string
   declarations: string
 }
 
-function parseCSSRules(css: string): CSSRule[] {
-  const rules: CSSRule[] = []
+function parseCSSRules(css: string): InlineCSSRule[] {
+  const rules: InlineCSSRule[] = []
   
   // Remove comentários CSS
-  css = css.replace(/\/\*[\s\S]*?\*\//g, '')
+  css = css.replace(CSS_COMMENT_REGEX, '')
   
-  // Regex para capturar regras CSS básicas
-  const ruleRegex = /([^{]+)\s*\{\s*([^}]+)\s*\}/g
+  // Varredura pelas chaves acompanhando a profundidade: só blocos de nível superior sem
+  // blocos internos viram regras. O conteúdo de @media & cia. é pulado inteiro - antes as
+  // regras internas de um @media eram inlineadas como se valessem sempre, e a primeira
+  // regra depois do bloco era descartada (o seletor vinha grudado no '}' de fechamento)
+  // Regex global compartilhada: reiniciar lastIndex antes de cada varredura
+  CSS_BRACE_REGEX.lastIndex = 0
+  let depth = 0
+  let selectorStart = 0
+  let declarationsStart = 0
+  let hasNestedBlock = false
   let match
   
-  while ((match = ruleRegex.exec(css)) !== null) {
-    const selector = match[1].trim()
-    const declarations = match[2].trim()
+  while ((match = CSS_BRACE_REGEX.exec(css)) !== null) {
+    if (match[0] === '{') {
+      if (depth === 0) {
+        declarationsStart = match.index + 1
+        hasNestedBlock = false
+      } else {
+        hasNestedBlock = true
+      }
+      depth++
+      continue
+    }
     
-    // Filtrar seletores simples (evitar pseudo-classes, media queries, etc.)
-    if (isSimpleSelector(selector)) {
-      rules.push({ selector, declarations })
+    if (depth === 0) {
+      // '}' sem abertura: ignorado
+      selectorStart = match.index + 1
+      continue
+    }
+    
+    depth--
+    if (depth === 0) {
+      if (!hasNestedBlock) {
+        const selector = css.substring(selectorStart, declarationsStart - 1).trim()
+        const declarations = css.substring(declarationsStart, match.index).trim()
+        
+        // Filtrar seletores simples (evitar pseudo-classes, media queries, etc.)
+        if (declarations && isSimpleSelector(selector)) {
+          rules.push({ selector, declarations })
+        }
+      }
+      selectorStart = match.index + 1
     }
   }
   
@@ -72,14 +159,7 @@ function parseCSSRules(css: string): CSSRule[] {
 
 function isSimpleSelector(selector: string): boolean {
   // Aceitar apenas seletores simples para emails
-  const simplePatterns = [
-    /^[a-zA-Z][a-zA-Z0-9]*$/, // tag simples: body, p, h1
-    /^\.[a-zA-Z][a-zA-Z0-9_-]*$/, // classe simples: .container, .button
-    /^#[a-zA-Z][a-zA-Z0-9_-]*$/, // id simples: #header
-    /^[a-zA-Z][a-zA-Z0-9]*\s*,\s*[a-zA-Z][a-zA-Z0-9]*$/ // múltiplos tags: h1, h2
-  ]
-  
-  return simplePatterns.some(pattern => pattern.test(selector.trim()))
+  return SIMPLE_SELECTOR_REGEX.test(selector.trim())
 }
 
-export default { inlineStyles }
\ No newline at end of file
+export default { inlineStyles, inlineStylesInDocument, compileCSSRules }
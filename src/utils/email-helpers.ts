@@ -1,27 +1,19 @@
 import { logger } from './logger'
 import cheerio from 'cheerio'
 
-/**
- * Gera HTML de exemplo baseado no prompt
- */
-export const generateFallbackHTML = (prompt: string) => {
-  logger.info('🧪 [FALLBACK] Gerando HTML de exemplo para prompt:', prompt.substring(0, 50))
-  
-  const promptLower = prompt.toLowerCase()
-  let html = ''
-  let subject = 'Email Personalizado'
-  let emailType = 'generic'
-  
-  if (promptLower.includes('promocional') || promptLower.includes('produto') || 
-      promptLower.includes('emagrecimento') || promptLower.includes('oferta')) {
-    emailType = 'promotional'
-    subject = 'Oferta Especial - Transformação Garantida!'
-    html = `<!DOCTYPE html>
+// Palavras-chave de todas as categorias em uma única alternação compilada
+// (case-insensitive para dispensar a cópia em minúsculas do prompt)
+const FALLBACK_TYPE_REGEX = /(?<promotional>promocional|produto|emagrecimento|oferta)|(?<newsletter>newsletter|informativo)/gi
+
+// Sem "<img" no texto não há imagem para o parser encontrar
+const IMG_TAG_PRESENT_REGEX = /<img/i
+
+const PROMOTIONAL_FALLBACK_HTML = `<!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>${subject}</title>
+    <title>Oferta Especial - Transformação Garantida!</title>
     <style>
         body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; margin: 0; padding: 24px; background: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%); }
         .container { max-width: 600px; margin: 0 auto; }
@@ -69,15 +61,13 @@ export const generateFallbackHTML = (prompt: string) => {
     </div>
 </body>
 </html>`
-  } else if (promptLower.includes('newsletter') || promptLower.includes('informativo')) {
-    emailType = 'newsletter'
-    subject = 'Newsletter Semanal - Principais Novidades'
-    html = `<!DOCTYPE html>
+
+const NEWSLETTER_FALLBACK_HTML = `<!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>${subject}</title>
+    <title>Newsletter Semanal - Principais Novidades</title>
     <style>
         body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; margin: 0; padding: 24px; background: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%); }
         .container { max-width: 600px; margin: 0 auto; }
@@ -134,13 +124,14 @@ export const generateFallbackHTML = (prompt: string) => {
     </div>
 </body>
 </html>`
-  } else {
-    html = `<!DOCTYPE html>
+
+// Template genérico dividido em torno do único trecho dinâmico (o prompt)
+const GENERIC_FALLBACK_HTML_HEAD = `<!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>${subject}</title>
+    <title>Email Personalizado</title>
     <style>
         body { margin: 0; padding: 24px; background: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%); font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; }
         .email-container { max-width: 600px; margin: 0 auto; }
@@ -174,7 +165,9 @@ export const generateFallbackHTML = (prompt: string) => {
         <div class="prompt-card">
             <div class="prompt-box">
                 <div class="prompt-label">💭 Sua solicitação</div>
-                <p class="prompt-text">"${prompt}"</p>
+                <p class="prompt-text">"`
+
+const GENERIC_FALLBACK_HTML_TAIL = `"</p>
             </div>
         </div>
         
@@ -184,9 +177,55 @@ export const generateFallbackHTML = (prompt: string) => {
     </div>
 </body>
 </html>`
+
+export type FallbackEmailType = 'promotional' | 'newsletter' | 'generic'
+
+/**
+ * Resultado do fallback com formato fixo (mesma forma de objeto em todas as chamadas)
+ */
+export interface FallbackEmailResult {
+  html: string
+  subject: string
+  emailType: FallbackEmailType
+}
+
+// Fallbacks sem trechos dinâmicos: resultado completo criado uma única vez
+const PROMOTIONAL_FALLBACK_RESULT: FallbackEmailResult = Object.freeze({
+  html: PROMOTIONAL_FALLBACK_HTML,
+  subject: 'Oferta Especial - Transformação Garantida!',
+  emailType: 'promotional'
+})
+
+const NEWSLETTER_FALLBACK_RESULT: FallbackEmailResult = Object.freeze({
+  html: NEWSLETTER_FALLBACK_HTML,
+  subject: 'Newsletter Semanal - Principais Novidades',
+  emailType: 'newsletter'
+})
+
+/**
+ * Gera HTML de exemplo baseado no prompt
+ */
+export const generateFallbackHTML = (prompt: string): FallbackEmailResult => {
+  logger.info('🧪 [FALLBACK] Gerando HTML de exemplo para prompt:', prompt.substring(0, 50))
+  
+  // Uma única varredura do prompt classifica todas as categorias
+  let isNewsletter = false
+  for (const match of prompt.matchAll(FALLBACK_TYPE_REGEX)) {
+    if (match.groups?.promotional !== undefined) {
+      return PROMOTIONAL_FALLBACK_RESULT
+    }
+    isNewsletter = true
+  }
+  
+  if (isNewsletter) {
+    return NEWSLETTER_FALLBACK_RESULT
   }
 
-  return { html, subject, emailType }
+  return {
+    html: GENERIC_FALLBACK_HTML_HEAD + prompt + GENERIC_FALLBACK_HTML_TAIL,
+    subject: 'Email Personalizado',
+    emailType: 'generic'
+  }
 }
 
 /**
@@ -197,6 +236,11 @@ export const processImagesHTML = async (html: string): Promise<string> => {
     return html
   }
 
+  // Teste barato antes de montar a árvore do documento inteiro
+  if (!IMG_TAG_PRESENT_REGEX.test(html)) {
+    return html
+  }
+
   try {
     const $ = cheerio.load(html)
     const images = $('img')
@@ -208,12 +252,15 @@ export const processImagesHTML = async (html: string): Promise<string> => {
     logger.info('🖼️ [EMAIL] Processing images:', { count: images.length })
 
     // Por enquanto, apenas log - implementação completa pode ser adicionada depois
-    images.each((_, img) => {
-      const src = $(img).attr('src')
-      if (src) {
-        logger.debug('📸 [EMAIL] Found image:', { src: src.substring(0, 50) + '...' })
-      }
-    })
+    // Percorre as imagens apenas quando o log de debug está ativo
+    if (logger.isDebugEnabled()) {
+      images.each((_, img) => {
+        const src = $(img).attr('src')
+        if (src) {
+          logger.debug('📸 [EMAIL] Found image:', { src: src.substring(0, 50) + '...' })
+        }
+      })
+    }
 
     return html
   } catch (error) {
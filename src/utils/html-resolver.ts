@@ -1,6 +1,58 @@
 import { supabaseAdmin } from '../config/supabase.config'
 import { logger } from './logger'
 
+// Palavras-chave que indicam EDIÇÃO específica (sem duplicatas, criadas uma única vez)
+const EDIT_KEYWORDS: readonly string[] = Object.freeze([
+  'mude', 'altere', 'troque', 'edite', 'modifique', 'corrija', 'ajuste', 'substitua', 'remova',
+  'adicione', 'insira', 'coloque', 'tire', 'delete', 'exclua', 'change', 'modify', 'edit',
+  'update', 'fix', 'correct', 'replace', 'remove', 'add', 'insert', 'exclude'
+])
+
+// Palavras-chave que indicam MELHORIA geral
+const IMPROVE_KEYWORDS: readonly string[] = Object.freeze([
+  'melhore', 'aprimore', 'optimize', 'refine', 'enhance', 'improve', 'polish', 'refactor',
+  'otimize', 'aperfeiçoe', 'revise', 'update'
+])
+
+// Tabela de despacho: lookahead em cada posição para que palavras sobrepostas não escondam
+// um acerto de EDIT (que vem primeiro na alternação e portanto tem prioridade)
+const OPERATION_KEYWORDS_REGEX = new RegExp(
+  `(?=(?<edit>${EDIT_KEYWORDS.join('|')})|(?<improve>${IMPROVE_KEYWORDS.join('|')}))`,
+  'gi'
+)
+
+const PROJECT_TEXT_PREVIEW_LENGTH = 300
+
+/**
+ * Remove as tags do HTML em uma única varredura, parando assim que o limite de
+ * caracteres de texto é atingido (equivalente a `replace(/<[^>]*>/g, '').substring(0, limit)`)
+ */
+function stripTagsPreview(html: string, limit: number): string {
+  let text = ''
+  let position = 0
+  
+  while (position < html.length && text.length < limit) {
+    const tagStart = html.indexOf('<', position)
+    if (tagStart === -1) {
+      text += html.substring(position)
+      break
+    }
+    
+    text += html.substring(position, tagStart)
+    
+    const tagEnd = html.indexOf('>', tagStart + 1)
+    if (tagEnd === -1) {
+      // '<' sem fechamento é mantido como texto
+      text += html.substring(tagStart)
+      break
+    }
+    
+    position = tagEnd + 1
+  }
+  
+  return text.substring(0, limit)
+}
+
 /**
  * ✅ FUNÇÃO ÚNICA PARA BUSCAR HTML ATUAL
  * Esta é a ÚNICA fonte de verdade para HTML atual no sistema
@@ -155,7 +207,7 @@ export class HTMLResolver {
         content: {
           html: html.trim(),
           subject: subject || '',
-          text: html.replace(/<[^>]*>/g, '').substring(0, 300), // Extract text preview
+          text: stripTagsPreview(html, PROJECT_TEXT_PREVIEW_LENGTH), // Extract text preview
           previewText: subject || ''
         },
         updated_at: new Date().toISOString()
@@ -208,34 +260,28 @@ export class HTMLResolver {
     }
     
     // REGRA ABSOLUTA #3: Se tem HTML, verificar intenção de modificação
-    const messageLower = message.toLowerCase()
-    
-    // Palavras-chave que indicam EDIÇÃO específica
-    const editKeywords = [
-      'mude', 'altere', 'troque', 'edite', 'modifique', 'corrija', 'ajuste', 'substitua', 'remova',
-      'adicione', 'insira', 'coloque', 'tire', 'delete', 'exclua', 'change', 'modify', 'edit',
-      'update', 'fix', 'correct', 'replace', 'remove', 'add', 'insert', 'delete', 'exclude'
-    ]
-    
-    // Palavras-chave que indicam MELHORIA geral
-    const improveKeywords = [
-      'melhore', 'aprimore', 'optimize', 'refine', 'enhance', 'improve', 'polish', 'refactor',
-      'otimize', 'refine', 'aperfeiçoe', 'revise', 'revise', 'update'
-    ]
-    
-    const hasEditIntent = editKeywords.some(word => messageLower.includes(word))
-    const hasImproveIntent = improveKeywords.some(word => messageLower.includes(word))
+    // Uma única varredura da mensagem para as duas tabelas; EDIT tem prioridade,
+    // então o primeiro acerto de EDIT encerra a busca
+    const detectedImproveKeywords: string[] = []
     
-    if (hasEditIntent) {
-      logger.info('[HTML-RESOLVER] ✅ Operação EDIT detectada', {
-        detectedKeywords: editKeywords.filter(word => messageLower.includes(word))
-      })
-      return 'edit'
+    for (const match of message.matchAll(OPERATION_KEYWORDS_REGEX)) {
+      const { edit, improve } = match.groups!
+      
+      if (edit) {
+        logger.info('[HTML-RESOLVER] ✅ Operação EDIT detectada', {
+          detectedKeywords: [edit.toLowerCase()]
+        })
+        return 'edit'
+      }
+      
+      if (improve) {
+        detectedImproveKeywords.push(improve.toLowerCase())
+      }
     }
     
-    if (hasImproveIntent) {
+    if (detectedImproveKeywords.length > 0) {
       logger.info('[HTML-RESOLVER] ✅ Operação IMPROVE detectada', {
-        detectedKeywords: improveKeywords.filter(word => messageLower.includes(word))
+        detectedKeywords: detectedImproveKeywords
       })
       return 'improve'
     }